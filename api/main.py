@@ -1,97 +1,354 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import os
+import sys
 import warnings
 from pathlib import Path
 
-# Ensure we're in the project root directory
+# Make src importable and resolve the model from the project root, whatever the working directory
 project_root = Path(__file__).resolve().parent.parent
-if os.getcwd() != str(project_root):
-    os.chdir(str(project_root))
-    print(f"Changed working directory to: {project_root}")
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 os.environ["PYCARET_CUSTOM_LOGGING_LEVEL"] = "CRITICAL"
 warnings.filterwarnings("ignore")
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import create_model
+from typing import List
 import pandas as pd
-from src.feature_engineering import engineer_features
-from src.inference import predict_attrition
-
-app = FastAPI(title="Attrition Prediction API", description="Predict employee attrition using a trained LDA model.")
-
-class EmployeeRecord(BaseModel):
-    # Define all input fields except Attrition (and EmployeeId is optional for tracking)
-    EmployeeId: Optional[int]
-    Age: int
-    BusinessTravel: str
-    DailyRate: int
-    Department: str
-    DistanceFromHome: int
-    Education: int
-    EducationField: str
-    EmployeeCount: int
-    EnvironmentSatisfaction: int
-    Gender: str
-    HourlyRate: int
-    JobInvolvement: int
-    JobLevel: int
-    JobRole: str
-    JobSatisfaction: int
-    MaritalStatus: str
-    MonthlyIncome: int
-    MonthlyRate: int
-    NumCompaniesWorked: int
-    Over18: str
-    OverTime: str
-    PercentSalaryHike: int
-    PerformanceRating: int
-    RelationshipSatisfaction: int
-    StandardHours: int
-    StockOptionLevel: int
-    TotalWorkingYears: int
-    TrainingTimesLastYear: int
-    WorkLifeBalance: int
-    YearsAtCompany: int
-    YearsInCurrentRole: int
-    YearsSinceLastPromotion: int
-    YearsWithCurrManager: int
+from src.batching import MicroBatcher
+from src.feature_engineering import engineer_features, normalize_categoricals
+from src.metrics import BATCH_ROWS, REQUEST_SECONDS, STAGE_SECONDS, render_metrics
+from src.inference import get_serving_version, predict_attrition, preload_model
+from src.prediction_cache import PredictionCache, record_key
+from src.schema import api_fields
+from src.table_formats import RESPONSE_MEDIA_TYPES, format_from_media_type, read_table, write_table
+
+# Micro-batching window: requests arriving within BATCH_MAX_WAIT_MS of each other are
+# scored together, up to BATCH_MAX_SIZE rows per batch
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "256"))
+# Rows scored and sent per chunk in streaming mode, and the largest chunk_size a request may ask for
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "5000"))
+MAX_STREAM_CHUNK_SIZE = 1_000_000
+# Prediction cache for /predict: PREDICTION_CACHE_SIZE=0 disables it, and a
+# PREDICTION_CACHE_TTL of 0 keeps entries until they are evicted or the model changes
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+MODEL_PATH = os.environ.get("MODEL_PATH", str(project_root / "models" / "final_lda_model"))
+# SCORING_FLOAT32=1 engineers features and runs the compiled engine in float32
+SCORING_FLOAT32 = os.environ.get("SCORING_FLOAT32", "0") == "1"
+
+# Synthetic employee used to exercise the full scoring path during warm-up
+WARMUP_RECORD = {
+    "EmployeeId": None, "Age": 35, "BusinessTravel": "Travel_Rarely", "DailyRate": 1100,
+    "Department": "Research & Development", "DistanceFromHome": 5, "Education": 3,
+    "EducationField": "Life Sciences", "EmployeeCount": 1, "EnvironmentSatisfaction": 3,
+    "Gender": "Male", "HourlyRate": 60, "JobInvolvement": 3, "JobLevel": 2,
+    "JobRole": "Research Scientist", "JobSatisfaction": 4, "MaritalStatus": "Single",
+    "MonthlyIncome": 5000, "MonthlyRate": 20000, "NumCompaniesWorked": 1, "Over18": "Y",
+    "OverTime": "No", "PercentSalaryHike": 15, "PerformanceRating": 3,
+    "RelationshipSatisfaction": 3, "StandardHours": 80, "StockOptionLevel": 1,
+    "TotalWorkingYears": 10, "TrainingTimesLastYear": 3, "WorkLifeBalance": 3,
+    "YearsAtCompany": 5, "YearsInCurrentRole": 3, "YearsSinceLastPromotion": 1,
+    "YearsWithCurrManager": 2,
+}
+# Seconds spent in each startup phase, reported by /health/ready
+STARTUP_TIMINGS = {}
+
+def warm_up():
+    """
+    Load the model and score WARMUP_RECORD through the full path, then mark the app ready.
+    Returns:
+        dict: Startup timings in seconds
+    """
+    start = time.perf_counter()
+    preload_model(MODEL_PATH, float32=SCORING_FLOAT32)
+    loaded = time.perf_counter()
+    EmployeeRecord(**WARMUP_RECORD)
+    score_frame(pd.DataFrame([WARMUP_RECORD]).drop(columns=['EmployeeId']))
+    done = time.perf_counter()
+    STARTUP_TIMINGS.update({
+        'model_load_s': round(loaded - start, 4),
+        'warmup_predict_s': round(done - loaded, 4),
+    })
+    app.state.ready = True
+    print(f"Startup timings (s): {STARTUP_TIMINGS}")
+    return dict(STARTUP_TIMINGS)
+
+@asynccontextmanager
+async def lifespan(app):
+    # api/serve.py warms up once in the parent before forking; plain uvicorn warms up here
+    if not app.state.ready:
+        try:
+            await asyncio.to_thread(warm_up)
+        except Exception as e:
+            # Keep serving; /health/ready stays 503 and requests load the model lazily
+            print(f"Warm-up failed: {e}")
+    yield
+
+app = FastAPI(title="Attrition Prediction API", description="Predict employee attrition using a trained LDA model.",
+              lifespan=lifespan)
+app.state.ready = False
+
+# All input fields except Attrition (EmployeeId is nullable, for tracking), generated from src.schema
+EmployeeRecord = create_model('EmployeeRecord', **api_fields())
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    # Handlers measure body parsing/validation as the time since this point
+    request.state.start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template rather than raw path to keep the label set bounded
+    route = request.scope.get('route')
+    REQUEST_SECONDS.observe(time.perf_counter() - request.state.start,
+                            endpoint=route.path if route is not None else 'unmatched')
+    return response
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Per-stage latency, batch size and model load metrics in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def root():
     return {"message": "Attrition Prediction API. Use /predict to get attrition predictions."}
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the /predict prediction cache."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/health/live")
+def live():
+    return {"status": "alive", "pid": os.getpid()}
+
+@app.get("/health/ready")
+def ready():
+    """Readiness probe: 503 until the model has been loaded and warmed up."""
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Model is not loaded yet")
+    return {"status": "ready", "pid": os.getpid(), "startup_timings": STARTUP_TIMINGS}
+
+@app.post("/health/warmup")
+async def warmup():
+    """Run the warm-up again (e.g. after deploying a new model) and return its timings."""
+    try:
+        return await asyncio.to_thread(warm_up)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Warm-up failed: {e}")
+
+def score_frame(df):
+    """Engineer features, normalize categoricals and predict for a frame of employee records."""
+    BATCH_ROWS.observe(len(df), kind='model_call')
+    with STAGE_SECONDS.time(stage='engineer_features'):
+        df_fe = engineer_features(df, float32=SCORING_FLOAT32)
+    with STAGE_SECONDS.time(stage='normalize_categoricals'):
+        normalize_categoricals(df_fe, inplace=True)
+    with STAGE_SECONDS.time(stage='predict'):
+        return predict_attrition(df_fe, MODEL_PATH, float32=SCORING_FLOAT32)
+
+batcher = MicroBatcher(score_frame, max_wait=BATCH_MAX_WAIT_MS / 1000, max_batch=BATCH_MAX_SIZE)
+prediction_cache = (PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL or None)
+                    if PREDICTION_CACHE_SIZE > 0 else None)
+
+async def predict_cached(rows):
+    """
+    Predict for a list of record dicts, serving unchanged records from the prediction cache.
+    Only cache misses go through feature engineering and the model; the cache is
+    invalidated automatically when the model artifact changes.
+    Returns:
+        list: One prediction dict per row, in order, without EmployeeId
+    """
+    version = get_serving_version(MODEL_PATH)
+    keys = [record_key(row) for row in rows]
+    results = [prediction_cache.get(key, version) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        df = pd.DataFrame([rows[i] for i in missing]).drop(columns=['EmployeeId'], errors='ignore')
+        preds = (await batcher.submit(df)).to_dict(orient='records')
+        for i, pred in zip(missing, preds):
+            prediction_cache.put(keys[i], version, pred)
+            results[i] = pred
+    return results
+
+def iter_scored_chunks(df, employee_ids, chunk_size, columns=None):
+    """
+    Score df chunk by chunk, yielding each prediction frame as soon as it is ready.
+    Args:
+        df (pd.DataFrame): Employee records without EmployeeId
+        employee_ids (pd.Series or None): EmployeeId aligned with df, added back to each chunk
+        chunk_size (int): Rows per chunk
+        columns (list): Prediction columns to keep (all when None)
+    """
+    for start in range(0, len(df), chunk_size):
+        preds = score_frame(df.iloc[start:start + chunk_size]).reset_index(drop=True)
+        if columns is not None:
+            preds = preds[columns]
+        if employee_ids is not None:
+            preds.insert(0, 'EmployeeId', employee_ids.iloc[start:start + chunk_size].to_numpy())
+        yield preds
+
+def iter_ndjson(chunks):
+    """Encode prediction chunks as newline-delimited JSON."""
+    for chunk in chunks:
+        yield chunk.to_json(orient='records', lines=True).rstrip('\n') + '\n'
+
+def iter_csv(chunks):
+    """Encode prediction chunks as one CSV document, writing the header only once."""
+    for i, chunk in enumerate(chunks):
+        yield chunk.to_csv(index=False, header=(i == 0))
+
+def iter_arrow(chunks):
+    """Encode prediction chunks as record batches of a single Arrow IPC stream."""
+    import io
+    import pyarrow as pa
+    buffer = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pa.ipc.new_stream(buffer, batch.schema)
+        writer.write_batch(batch)
+        # Hand over what the writer has produced so far and reuse the buffer
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if writer is not None:
+        writer.close()
+        yield buffer.getvalue()
+
 @app.post("/predict")
-def predict(records: List[EmployeeRecord]):
+async def predict(records: List[EmployeeRecord], request: Request, stream: bool = False,
+                  chunk_size: int = Query(STREAM_CHUNK_SIZE, gt=0, le=MAX_STREAM_CHUNK_SIZE)):
     """
     Predict attrition for a list of employees.
+    Records from concurrent requests are coalesced into one batch before scoring.
+    With ?stream=true the records are scored in chunks of chunk_size and the predictions
+    are streamed back as NDJSON, one object per line, as each chunk completes. Only the
+    response is streamed: the JSON body is parsed and validated in full first.
     Example request:
     [
       {"EmployeeId": 1, "Age": 35, ...},
       {"EmployeeId": 2, "Age": 42, ...}
     ]
     """
+    STAGE_SECONDS.observe(time.perf_counter() - request.state.start, stage='parse_validate')
+    BATCH_ROWS.observe(len(records), kind='request')
     try:
+        if prediction_cache is not None and not stream:
+            rows = [r.dict() for r in records]
+            with STAGE_SECONDS.time(stage='batch'):
+                preds = await predict_cached(rows)
+            with STAGE_SECONDS.time(stage='serialize'):
+                return JSONResponse([{'EmployeeId': row['EmployeeId'], **pred} for row, pred in zip(rows, preds)])
         # Convert input to DataFrame
-        df = pd.DataFrame([r.dict() for r in records])
-        # Save EmployeeId for tracking if present
+        with STAGE_SECONDS.time(stage='dataframe'):
+            df = pd.DataFrame([r.dict() for r in records])
+            # Save EmployeeId for tracking if present
+            employee_ids = df['EmployeeId'].reset_index(drop=True) if 'EmployeeId' in df.columns else None
+            # Drop EmployeeId before feature engineering and prediction
+            if 'EmployeeId' in df.columns:
+                df = df.drop(columns=['EmployeeId'])
+        if stream:
+            chunks = iter_scored_chunks(df, employee_ids, chunk_size)
+            return StreamingResponse(iter_ndjson(chunks), media_type='application/x-ndjson')
+        # Feature engineering and prediction run in the shared batch, off the event loop;
+        # the batch stage includes the time spent waiting for the batch window
+        with STAGE_SECONDS.time(stage='batch'):
+            preds = await batcher.submit(df)
+        # Add EmployeeId back if present
+        with STAGE_SECONDS.time(stage='serialize'):
+            if employee_ids is not None:
+                preds = pd.concat([employee_ids, preds.reset_index(drop=True)], axis=1)
+            # Return predictions as list of dicts
+            return JSONResponse(preds.to_dict(orient='records'))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def validate_columns(df):
+    """
+    Validate a bulk upload column-wise against the EmployeeRecord schema.
+    Integer fields are converted with one vectorized cast per column instead of per-row validation.
+    Args:
+        df (pd.DataFrame): Uploaded table (extra columns such as Attrition are dropped)
+    Returns:
+        pd.DataFrame: Table restricted to the EmployeeRecord fields
+    Raises:
+        ValueError: If a required column is missing or has missing/non-numeric values
+    """
+    fields = EmployeeRecord.model_fields
+    required = [name for name in fields if name != 'EmployeeId']
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    df = df[[name for name in fields if name in df.columns]]
+    errors = []
+    for name in required:
+        col = df[name]
+        if col.isna().any():
+            errors.append(f"{name}: {int(col.isna().sum())} missing values")
+        elif fields[name].annotation is int and not pd.api.types.is_integer_dtype(col):
+            numeric = pd.to_numeric(col, errors='coerce')
+            if numeric.isna().any() or (numeric % 1 != 0).any():
+                errors.append(f"{name}: expected integers")
+            else:
+                df = df.assign(**{name: numeric.astype('int64')})
+    if errors:
+        raise ValueError('Invalid columns: ' + '; '.join(errors))
+    return df
+
+# Streaming encoders for /predict/bulk; Parquet needs its footer so it cannot be streamed
+STREAM_ENCODERS = {'csv': iter_csv, 'arrow': iter_arrow}
+
+@app.post("/predict/bulk")
+async def predict_bulk(request: Request, stream: bool = False,
+                       chunk_size: int = Query(STREAM_CHUNK_SIZE, gt=0, le=MAX_STREAM_CHUNK_SIZE)):
+    """
+    Predict attrition for a whole table of employees in one request.
+    The body is a CSV, Parquet or Arrow IPC table in the schema of data/employee_data_cleaned.csv,
+    selected with the Content-Type header (text/csv, application/vnd.apache.parquet,
+    application/vnd.apache.arrow.stream). The response uses the same format and holds
+    EmployeeId (if given), prediction_label and prediction_score for every row.
+    With ?stream=true CSV and Arrow responses are scored and sent chunk_size rows at a time.
+    Only the response is streamed: the upload is read and validated in full before the
+    first chunk is scored, so memory still grows with the request body.
+    """
+    try:
+        fmt = format_from_media_type(request.headers.get('content-type'))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if stream and fmt not in STREAM_ENCODERS:
+        raise HTTPException(status_code=400, detail=f"Streaming is not supported for {fmt} responses")
+    body = await request.body()
+    try:
+        with STAGE_SECONDS.time(stage='bulk_read'):
+            df = await asyncio.to_thread(read_table, body, fmt)
+        with STAGE_SECONDS.time(stage='bulk_validate'):
+            df = validate_columns(df)
+        BATCH_ROWS.observe(len(df), kind='request')
         employee_ids = df['EmployeeId'].reset_index(drop=True) if 'EmployeeId' in df.columns else None
-        # Drop EmployeeId before feature engineering and prediction
-        if 'EmployeeId' in df.columns:
+        if employee_ids is not None:
             df = df.drop(columns=['EmployeeId'])
-        # Apply feature engineering
-        df_fe = engineer_features(df)
-        # Preprocess categorical columns
-        categorical_cols = ['BusinessTravel', 'Department', 'EducationField', 
-                           'Gender', 'JobRole', 'MaritalStatus', 'Over18', 'OverTime', 'AgeGroup']
-        for col in categorical_cols:
-            df_fe[col] = df_fe[col].astype(str).str.replace(' ', '_').str.replace('&', '_and_')
-        # Predict
-        preds = predict_attrition(df_fe)
-        # Add EmployeeId back if present
+        if stream:
+            chunks = iter_scored_chunks(df, employee_ids, chunk_size,
+                                        columns=['prediction_label', 'prediction_score'])
+            return StreamingResponse(STREAM_ENCODERS[fmt](chunks), media_type=RESPONSE_MEDIA_TYPES[fmt])
+        preds = await asyncio.to_thread(score_frame, df)
+        result = preds[['prediction_label', 'prediction_score']].reset_index(drop=True)
         if employee_ids is not None:
-            preds = pd.concat([employee_ids, preds.reset_index(drop=True)], axis=1)
-        # Return predictions as list of dicts
-        return preds.to_dict(orient='records')
+            result.insert(0, 'EmployeeId', employee_ids)
+        with STAGE_SECONDS.time(stage='bulk_serialize'):
+            payload = await asyncio.to_thread(write_table, result, fmt)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=payload, media_type=RESPONSE_MEDIA_TYPES[fmt])
+
+STARTUP_TIMINGS['import_s'] = round(time.perf_counter() - _IMPORT_START, 4)
@@ -0,0 +1,103 @@
+"""
+Multi-process server for the attrition API.
+
+The parent process imports the app, loads the model and then forks the workers, so
+the libraries and the model are shared copy-on-write instead of being loaded once per
+worker. All workers accept connections from one listening socket. Dead workers are
+restarted; SIGINT/SIGTERM stop all of them.
+
+Usage:
+    python api/serve.py --workers 4 --host 0.0.0.0 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the attrition API from N forked workers.")
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes.')
+    parser.add_argument('--log-level', default='info', help='Uvicorn log level.')
+    return parser.parse_args()
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock, log_level):
+    """Serve app on the shared socket until uvicorn exits."""
+    import uvicorn
+    # Restore default handlers so uvicorn can install its own graceful shutdown
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # The model is already loaded; lifespan only sees app.state.ready=True
+    config = uvicorn.Config(app, log_level=log_level, lifespan='on')
+    uvicorn.Server(config).run(sockets=[sock])
+
+def spawn(app, sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, log_level)
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+def main():
+    args = parse_args()
+    from api.main import app, warm_up
+    if not hasattr(os, 'fork') or args.workers <= 1:
+        # No fork on Windows: fall back to a single in-process server
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+    warm_up()
+    sock = bind_socket(args.host, args.port)
+    # Move everything loaded so far out of the GC's reach so collections in the
+    # workers do not write to (and un-share) the preloaded model pages
+    gc.collect()
+    gc.freeze()
+    workers = {spawn(app, sock, args.log_level) for _ in range(args.workers)}
+    print(f"Serving on {args.host}:{args.port} with {len(workers)} workers (parent pid {os.getpid()})")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            workers.add(spawn(app, sock, args.log_level))
+    sock.close()
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@
 Load and clean the employee attrition dataset.
 """
 # %%
-from src.data_processing import load_data, clean_data, split_data
+from src.data_processing import load_data, save_data, clean_data, split_data
 import pandas as pd
 from IPython.display import display, Markdown
 # %%
@@ -40,8 +40,8 @@ display(Markdown("""
 We optionally split the cleaned data into modeling and inference sets for downstream tasks.
 """))
 # %%
-# Save cleaned data for next steps
-clean_df.to_csv('data/employee_data_cleaned.csv', index=False)
+# Save cleaned data for next steps (Parquet keeps the compact dtypes)
+save_data(clean_df, 'data/employee_data_cleaned.parquet')
 # %%
 display(Markdown("""
 ## Save Cleaned Data
@@ -4,7 +4,8 @@
 Create new features for modeling employee attrition.
 """
 # %%
-from src.feature_engineering import engineer_features
+from src.feature_store import update_feature_store, load_features
+from src.data_processing import load_data, save_data
 import pandas as pd
 from IPython.display import display, Markdown
 # %%
@@ -18,15 +19,18 @@ display(Markdown("""
 ## Load Cleaned Data
 We start by loading the cleaned dataset prepared in the previous step.
 """))
-clean_df = pd.read_csv('data/employee_data_cleaned.csv')
+clean_df = load_data('data/employee_data_cleaned.parquet')
 clean_df.head()
 # %%
 # Engineer features
 display(Markdown("""
 ## Engineer Features
 We apply feature engineering techniques to create new variables that may help predict attrition.
+Features are kept in a store keyed by EmployeeId, so only new or changed employees are recomputed.
 """))
-features_df = engineer_features(clean_df)
+store_stats = update_feature_store(clean_df)
+print(f"Feature store: {store_stats}")
+features_df = load_features()
 features_df.head()
 # %%
 # Save engineered features for modeling
@@ -34,4 +38,4 @@ display(Markdown("""
 ## Save Engineered Features
 The engineered features are saved for use in the modeling notebook.
 """))
-features_df.to_csv('data/employee_data_features.csv', index=False) 
\ No newline at end of file
+save_data(features_df, 'data/employee_data_features.parquet') 
\ No newline at end of file
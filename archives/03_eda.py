@@ -7,6 +7,7 @@ Visualize and summarize the cleaned employee attrition data.
 from src.eda_tools import plot_attrition_by_category, create_correlation_heatmap, plot_satisfaction_distribution, perform_eda, \
     get_numeric_summary, get_categorical_summary, get_value_counts, get_missing_values, t_test_by_attrition, chi_square_test, correlation_test, \
     plot_histograms, plot_boxplots_by_attrition, plot_barplots_for_categorical, plot_stacked_bar_chart, plot_pairplot, plot_violin_by_attrition, plot_categorical_heatmap
+from src.data_processing import load_data
 import pandas as pd
 from IPython.display import display
 from IPython.display import Markdown
@@ -22,7 +23,7 @@ Let's load and preview the cleaned dataset to understand its structure and conte
 """))
 # %%
 # Load feature-engineered data for EDA
-clean_df = pd.read_csv('data/employee_data_features.csv')
+clean_df = load_data('data/employee_data_features.parquet')
 clean_df.head()
 # %%
 display(Markdown("""
@@ -4,14 +4,17 @@
 Train and evaluate models for employee attrition prediction.
 """
 # %%
-from src.modeling import setup_modeling, train_and_tune_model, evaluate_trained_model, plot_feature_importance, save_trained_model
+from src.data_processing import load_data
+from src.feature_engineering import normalize_categoricals
+from src.modeling import SETUP_CACHE_DIR, setup_modeling, compare_candidates, train_and_tune_model, evaluate_trained_model, plot_feature_importance, save_trained_model, save_training_matrix, export_scoring_engine
 import pandas as pd
 from IPython.display import display, Markdown
 from sklearn.metrics import confusion_matrix, classification_report, roc_curve, precision_recall_curve
 import numpy as np
 import os
-from pycaret.classification import predict_model, plot_model, pull
+from pycaret.classification import predict_model, plot_model, pull, get_config
 import shutil
+from src.profiling import PhaseProfiler
 import shap
 import matplotlib.pyplot as plt
 # %%
@@ -26,7 +29,7 @@ We load the dataset with engineered features for modeling.
 """))
 # %%
 # Load engineered features
-features_df = pd.read_csv('data/employee_data_features.csv')
+features_df = load_data('data/employee_data_features.parquet')
 features_df.head()
 # %%
 display(Markdown("""
@@ -35,18 +38,29 @@ We preprocess categorical variables to ensure they are in a suitable format for
 """))
 # %%
 # Preprocess categorical columns for modeling (if needed)
-categorical_cols = ['BusinessTravel', 'Department', 'EducationField', 
-                   'Gender', 'JobRole', 'MaritalStatus', 'Over18', 'OverTime', 'AgeGroup']
-for col in categorical_cols:
-    features_df[col] = features_df[col].astype(str).str.replace(' ', '_').str.replace('&', '_and_')
+normalize_categoricals(features_df, inplace=True)
 # %%
 display(Markdown("""
 ## Setup Modeling Environment
 We initialize the modeling environment, including data splitting and preprocessing.
 """))
 # %%
-# Setup modeling environment
-setup_modeling(features_df)
+# Setup modeling environment (reuses the fitted preprocessing when data and settings are unchanged)
+# Set PROFILE_TRAINING=1 to write per-phase timings and memory to models/final_lda_model_profile.json,
+# or PROFILE_TRAINING=steps to also refit each preprocessing step separately (slower: one extra CV)
+profiler = PhaseProfiler() if os.environ.get('PROFILE_TRAINING') in ('1', 'steps') else None
+profile_steps = os.environ.get('PROFILE_TRAINING') == 'steps'
+setup_modeling(features_df, cache_dir=SETUP_CACHE_DIR, profiler=profiler, profile=profile_steps)
+# %%
+display(Markdown("""
+## Compare Candidate Models
+We cross-validate several model families in parallel on the same preprocessing, within a time budget, and rank them on Recall.
+"""))
+# %%
+leaderboard = compare_candidates(budget=600)
+display(leaderboard)
+os.makedirs('results', exist_ok=True)
+leaderboard.to_csv('results/model_leaderboard.csv')
 # %%
 display(Markdown("""
 ## Train and Tune Model
@@ -54,7 +68,7 @@ We train and tune a machine learning model to optimize for recall (catching as m
 """))
 # %%
 # Train and tune model
-model = train_and_tune_model(model_name='lda', optimize='Recall', n_iter=50)
+model = train_and_tune_model(model_name='lda', optimize='Recall', n_iter=50, profiler=profiler, profile=profile_steps)
 # %%
 display(Markdown("""
 ## Evaluate Model
@@ -65,12 +79,14 @@ We evaluate the trained model's performance using relevant metrics.
 evaluate_trained_model(model)
 
 # Save model
-model_path = save_trained_model(model, 'models/final_lda_model')
+model_path = save_trained_model(model, 'models/final_lda_model', profiler=profiler)
 # PyCaret appends .pkl if not present
 if not os.path.exists('models/final_lda_model.pkl'):
     print("WARNING: Model file models/final_lda_model.pkl not found after saving.")
 else:
     print("Model saved as models/final_lda_model.pkl")
+    # Preprocessed training rows, so monthly extracts can use incremental_retrain
+    save_training_matrix('models/final_lda_model', features_df.loc[get_config('X_train').index])
 
 # Export confusion matrix and classification report
 try:
@@ -142,6 +158,8 @@ The final trained model is saved for future inference and deployment.
 # %%
 # Save model
 save_trained_model(model, 'models/final_lda_model') 
+# Export the compiled scoring engine used by the API (checked against predict_model)
+export_scoring_engine(features_df, 'models/final_lda_model')
 
 # %%
 display(Markdown("""
@@ -5,7 +5,8 @@ Use the trained model to predict attrition on new/unseen data.
 """
 # %%
 from src.inference import predict_attrition
-from src.feature_engineering import engineer_features
+from src.feature_store import load_features
+from src.feature_engineering import normalize_categoricals
 import pandas as pd
 from IPython.display import display, Markdown
 # %%
@@ -16,11 +17,11 @@ This notebook uses the trained attrition model to make predictions on new or uns
 # %%
 display(Markdown("""
 ## Load New/Unseen Data
-We load new or held-out employee data for inference. Replace with actual new data as needed.
+We load engineered features for every employee from the feature store, which only recomputes new or changed employees.
 """))
 # %%
-# Load new/unseen data (simulate with held-out set)
-infer_df = pd.read_csv('data/employee_data_cleaned.csv')  # Replace with actual new data if available
+# Load engineered features from the feature store (kept up to date by 02_feature_engineering)
+infer_df = load_features()
 # %%
 display(Markdown("""
 ## Prepare Input Data
@@ -28,15 +29,7 @@ We remove columns not needed for prediction (e.g., Attrition, EmployeeId).
 """))
 # %%
 # Drop Attrition and EmployeeId if present
-infer_input = infer_df.drop(columns=[col for col in ['Attrition', 'EmployeeId'] if col in infer_df.columns])
-# %%
-display(Markdown("""
-## Engineer Features for Inference
-We apply the same feature engineering steps as in training to ensure consistency.
-"""))
-# %%
-# Engineer features for inference
-df_infer_fe = engineer_features(infer_input)
+df_infer_fe = infer_df.drop(columns=[col for col in ['Attrition', 'EmployeeId'] if col in infer_df.columns])
 # %%
 display(Markdown("""
 ## Preprocess Categorical Columns
@@ -44,11 +37,7 @@ We preprocess categorical variables to match the format used during model traini
 """))
 # %%
 # Preprocess categorical columns as in training
-categorical_cols = ['BusinessTravel', 'Department', 'EducationField', 
-                   'Gender', 'JobRole', 'MaritalStatus', 'Over18', 'OverTime', 'AgeGroup']
-for col in categorical_cols:
-    if col in df_infer_fe.columns:
-        df_infer_fe[col] = df_infer_fe[col].astype(str).str.replace(' ', '_').str.replace('&', '_and_')
+normalize_categoricals(df_infer_fe, inplace=True)
 # %%
 display(Markdown("""
 ## Predict Attrition
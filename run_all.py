@@ -16,8 +16,8 @@ except ImportError:
     Fore = Style = Dummy()
 
 NOTEBOOKS = [
-    ("archives/01_data_cleaning.py", ["data/employee_data_cleaned.csv"]),
-    ("archives/03_feature_engineering.py", ["data/employee_data_features.csv"]),
+    ("archives/01_data_cleaning.py", ["data/employee_data_cleaned.parquet"]),
+    ("archives/03_feature_engineering.py", ["data/feature_store.parquet", "data/employee_data_features.parquet"]),
     ("archives/02_eda.py", ["results/numeric_summary.csv", "results/categorical_summary.csv"]),
     ("archives/04_modeling.py", ["models/final_lda_model", "results/confusion_matrix.md"]),
     ("archives/05_inference.py", ["results/predictions.csv"]), # adjust as needed
@@ -0,0 +1,78 @@
+import asyncio
+import pandas as pd
+
+class MicroBatcher:
+    """
+    Coalesce concurrent scoring requests into a single batch.
+    Frames submitted within max_wait seconds of the first pending one (or until
+    max_batch rows are pending) are concatenated, scored with one call to score_fn
+    in a worker thread, and the result rows are handed back to each caller.
+    """
+
+    def __init__(self, score_fn, max_wait=0.002, max_batch=256):
+        self.score_fn = score_fn
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._pending = []
+        self._pending_rows = 0
+        self._timer = None
+        # Keep references to in-flight batch tasks so they are not garbage collected
+        self._tasks = set()
+
+    async def submit(self, df):
+        """
+        Score df as part of the next batch.
+        Args:
+            df (pd.DataFrame): Rows to score
+        Returns:
+            pd.DataFrame: score_fn's output for exactly these rows
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((df, future))
+        self._pending_rows += len(df)
+        if self._pending_rows >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._score(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, batch):
+        try:
+            result = await asyncio.to_thread(
+                self.score_fn, pd.concat([df for df, _ in batch], ignore_index=True))
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0][1], error=e)
+                return
+            # Rescore requests one by one so a bad request only fails itself
+            for df, future in batch:
+                try:
+                    _resolve(future, await asyncio.to_thread(self.score_fn, df))
+                except Exception as part_error:
+                    _resolve(future, error=part_error)
+            return
+        start = 0
+        for df, future in batch:
+            stop = start + len(df)
+            _resolve(future, result.iloc[start:stop].reset_index(drop=True))
+            start = stop
+
+def _resolve(future, result=None, error=None):
+    """Set the result or exception of a future unless its caller has gone away."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
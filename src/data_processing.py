@@ -1,54 +1,258 @@
+import hashlib
+import json
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from src.feature_engineering import engineer_features
+from src.schema import ID_COLUMN, TARGET, clean_dtypes, csv_dtypes
 
-def load_data(filepath):
-    """Load employee data from a CSV file."""
-    return pd.read_csv(filepath)
+# Columnar formats keep the compact dtypes (int8/int16/category) set by clean_data
+COLUMNAR_SUFFIXES = ('.parquet', '.feather')
 
-def clean_data(df):
-    """Clean the dataset by handling missing values and adjusting data types."""
-    df_clean = df.copy()
-    # Remove duplicates
-    df_clean = df_clean.drop_duplicates()
+def load_data(filepath, columns=None):
+    """
+    Load employee data from a CSV, Parquet or Feather file (chosen by extension).
+    Args:
+        filepath (str): Path to the data file
+        columns (list): Only read these columns; Parquet and Feather skip the others on disk
+    Returns:
+        pd.DataFrame: Loaded data
+    """
+    if filepath.endswith('.parquet'):
+        return pd.read_parquet(filepath, columns=columns)
+    if filepath.endswith('.feather'):
+        return pd.read_feather(filepath, columns=columns)
+    # Parse known columns straight into their compact schema dtypes
+    return pd.read_csv(filepath, usecols=columns, dtype=csv_dtypes(columns))
+
+def save_data(df, filepath):
+    """
+    Save data as CSV, Parquet or Feather (chosen by extension).
+    Parquet and Feather preserve the int8/int16/category dtypes set by clean_data,
+    so loading them back needs no re-parsing or casting.
+    """
+    if filepath.endswith('.parquet'):
+        df.to_parquet(filepath, index=False)
+    elif filepath.endswith('.feather'):
+        df.reset_index(drop=True).to_feather(filepath)
+    else:
+        df.to_csv(filepath, index=False)
+
+def iter_data(filepath, chunksize=100_000):
+    """Yield employee data from a CSV or Parquet file in DataFrames of at most chunksize rows."""
+    if filepath.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+    with pd.read_csv(filepath, chunksize=chunksize, dtype=csv_dtypes()) as reader:
+        yield from reader
+
+def row_hashes(df):
+    """
+    Hash every row of df by value.
+    Numeric columns are hashed as float64 so a value hashes the same whether its
+    chunk was parsed as int or as float (because of a missing value elsewhere).
+    """
+    normalized = df.apply(lambda col: col.astype('float64')
+                          if pd.api.types.is_numeric_dtype(col) else col.astype(str))
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+def dataset_fingerprint(df):
+    """Return a hex digest of the column names and row values of df (row order included)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode('utf-8'))
+    digest.update(row_hashes(df).tobytes())
+    return digest.hexdigest()
+
+# Duplicate detection modes accepted by clean_data
+DEDUP_MODES = ('rows', 'hash', 'id', None)
+
+def clean_data(df, inplace=False, dedup='hash', report=False):
+    """
+    Clean the dataset by handling missing values and adjusting data types.
+    Duplicates and rows without a target are dropped with one row selection, and only
+    columns whose dtype differs from the schema are cast, each replaced once.
+    Args:
+        df (pd.DataFrame): Raw employee data
+        inplace (bool): Modify df itself instead of working on a copy
+        dedup (str): 'hash' drops exact duplicate rows using one 8-byte hash per row,
+            'rows' uses a full-row drop_duplicates, 'id' keeps the first row per
+            EmployeeId and None skips duplicate removal
+        report (bool): Also return a memory and row count report
+    Returns:
+        pd.DataFrame: Cleaned data (df itself if inplace), or (df, report) if report is set
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {DEDUP_MODES}, got {dedup!r}")
+    bytes_before = int(df.memory_usage(deep=True).sum()) if report else None
+    rows_before = len(df)
+    # Rows to keep: first occurrence of each duplicate, with a known target
+    if dedup == 'hash':
+        duplicated = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy()).duplicated().to_numpy()
+    elif dedup == 'rows':
+        duplicated = df.duplicated().to_numpy()
+    elif dedup == 'id':
+        duplicated = df[ID_COLUMN].duplicated().to_numpy()
+    else:
+        duplicated = np.zeros(len(df), dtype=bool)
     # Convert Attrition to numeric if needed
-    if df_clean['Attrition'].dtype == 'object':
-        df_clean['Attrition'] = df_clean['Attrition'].map({'Yes': 1, 'No': 0})
-    df_clean = df_clean[df_clean['Attrition'].notna()]
-    # Convert categorical columns
-    categorical_cols = ['BusinessTravel', 'Department', 'EducationField', 
-                       'Gender', 'JobRole', 'MaritalStatus', 'Over18', 'OverTime']
-    for col in categorical_cols:
-        df_clean[col] = df_clean[col].astype('category')
-    # Convert ordinal columns
-    ordinal_cols = {
-        'Education': 'int8',
-        'EnvironmentSatisfaction': 'int8',
-        'JobInvolvement': 'int8',
-        'JobLevel': 'int8',
-        'JobSatisfaction': 'int8',
-        'PerformanceRating': 'int8',
-        'RelationshipSatisfaction': 'int8',
-        'StockOptionLevel': 'int8',
-        'WorkLifeBalance': 'int8'
+    attrition = df[TARGET]
+    mapped = attrition.dtype == 'object'
+    if mapped:
+        attrition = attrition.map({'Yes': 1, 'No': 0})
+    keep = ~duplicated & attrition.notna().to_numpy()
+    if inplace:
+        if not keep.all():
+            # Drop by position: the index may hold duplicate labels
+            index = df.index
+            df.index = pd.RangeIndex(len(df))
+            df.drop(index=np.flatnonzero(~keep), inplace=True)
+            df.index = index[keep]
+        df_clean = df
+    else:
+        # take() makes the one copy and, unlike boolean indexing, is not flagged as a view
+        df_clean = df.take(np.flatnonzero(keep))
+    if mapped:
+        df_clean[TARGET] = attrition.to_numpy()[keep]
+    # Cast categorical, ordinal and numeric columns to their schema dtypes
+    for col, dtype in clean_dtypes(df_clean.columns).items():
+        if df_clean[col].dtype != dtype:
+            df_clean[col] = df_clean[col].astype(dtype)
+    if not report:
+        return df_clean
+    return df_clean, {
+        'rows_before': rows_before,
+        'rows_after': len(df_clean),
+        'duplicates_removed': int(duplicated.sum()),
+        'missing_target_removed': int((~duplicated & ~keep).sum()),
+        'bytes_before': bytes_before,
+        'bytes_after': int(df_clean.memory_usage(deep=True).sum()),
     }
-    for col, dtype in ordinal_cols.items():
-        df_clean[col] = df_clean[col].astype(dtype)
-    # Convert numeric columns
-    df_clean['Age'] = df_clean['Age'].astype('int8')
-    df_clean['DailyRate'] = df_clean['DailyRate'].astype('int16')
-    df_clean['HourlyRate'] = df_clean['HourlyRate'].astype('int16')
-    df_clean['MonthlyIncome'] = df_clean['MonthlyIncome'].astype('int32')
-    df_clean['MonthlyRate'] = df_clean['MonthlyRate'].astype('int32')
-    df_clean['PercentSalaryHike'] = df_clean['PercentSalaryHike'].astype('int8')
-    df_clean['StandardHours'] = df_clean['StandardHours'].astype('int8')
-    df_clean['TrainingTimesLastYear'] = df_clean['TrainingTimesLastYear'].astype('int8')
-    years_cols = ['NumCompaniesWorked', 'TotalWorkingYears', 'YearsAtCompany',
-                 'YearsInCurrentRole', 'YearsSinceLastPromotion', 'YearsWithCurrManager']
-    for col in years_cols:
-        df_clean[col] = df_clean[col].astype('int8')
-    return df_clean
+
+def split_fractions(df, random_state=42):
+    """
+    Map every row to a deterministic number in [0, 1) from its EmployeeId and the seed.
+    Rows without an EmployeeId fall back to a hash of the whole row.
+    """
+    ids = df[ID_COLUMN]
+    keys = np.where(ids.isna(), row_hashes(df), ids.fillna(0).to_numpy(dtype='int64').view('uint64'))
+    seed = pd.util.hash_array(np.array([random_state], dtype='uint64'))[0]
+    hashes = pd.util.hash_array(keys.astype('uint64') ^ seed)
+    # Top 53 bits give an evenly spread float64
+    return (hashes >> np.uint64(11)).astype('float64') / float(2 ** 53)
+
+def assign_split(df, test_size=0.2, random_state=42):
+    """
+    Return a boolean mask of the rows that go to the inference set.
+    A row goes to the inference set when its split fraction is below the test size of
+    its Attrition class, so every class is split in (approximately) the requested
+    ratio without seeing the rest of the data. An employee's assignment depends only
+    on their EmployeeId and the seed, so it never changes as new rows are appended.
+    Args:
+        df (pd.DataFrame): Data with EmployeeId and Attrition columns
+        test_size (float or dict): Inference share, or {Attrition class: share}
+        random_state (int): Seed of the assignment
+    Returns:
+        np.ndarray: True for inference rows
+    """
+    fractions = split_fractions(df, random_state)
+    if isinstance(test_size, dict):
+        thresholds = df[TARGET].map(test_size).to_numpy(dtype='float64', na_value=0.0)
+    else:
+        thresholds = test_size
+    return fractions < thresholds
 
 def split_data(df, test_size=0.2, random_state=42):
-    """Split data into modeling and inference sets."""
-    df_model, df_infer = train_test_split(df, test_size=test_size, random_state=random_state, stratify=df['Attrition'])
-    return df_model, df_infer 
\ No newline at end of file
+    """
+    Split data into modeling and inference sets, stratified by Attrition.
+    Rows are assigned by a hash of EmployeeId and the seed (see assign_split), so the
+    split is reproducible and stable as new employees are appended.
+    """
+    is_infer = assign_split(df, test_size=test_size, random_state=random_state)
+    return df[~is_infer], df[is_infer]
+
+def split_in_chunks(input_path, model_path, infer_path, test_size=0.2, random_state=42, chunksize=100_000):
+    """
+    Split a cleaned CSV or Parquet file into modeling and inference files chunk by chunk.
+    Rows land in the same set as split_data would put them, without loading the whole file.
+    Args:
+        input_path (str): Cleaned data (CSV or Parquet)
+        model_path (str): CSV or Parquet file for the modeling set; overwritten if it exists
+        infer_path (str): CSV or Parquet file for the inference set; overwritten if it exists
+        test_size (float or dict): Inference share, or {Attrition class: share}
+        random_state (int): Seed of the assignment
+        chunksize (int): Rows read at a time
+    Returns:
+        tuple: Number of modeling rows and of inference rows written
+    """
+    model_writer = _ChunkWriter(model_path)
+    infer_writer = _ChunkWriter(infer_path)
+    try:
+        for chunk in iter_data(input_path, chunksize=chunksize):
+            is_infer = assign_split(chunk, test_size=test_size, random_state=random_state)
+            model_writer.write(chunk[~is_infer])
+            infer_writer.write(chunk[is_infer])
+    finally:
+        model_writer.close()
+        infer_writer.close()
+    return model_writer.rows, infer_writer.rows
+
+def process_in_chunks(input_path, output_path, chunksize=100_000, engineer=True):
+    """
+    Clean (and optionally feature-engineer) a large CSV chunk by chunk, appending to output_path.
+    Memory stays bounded by the chunk size rather than the file size. Duplicate rows
+    are still removed across the whole file by remembering an 8-byte hash per row.
+    Args:
+        input_path (str): CSV in the schema of data/employee_data.csv
+        output_path (str): CSV or Parquet file to write (one row group per chunk); overwritten if it exists
+        chunksize (int): Rows read and processed at a time
+        engineer (bool): Also apply engineer_features to every chunk
+    Returns:
+        int: Number of rows written
+    """
+    seen = np.empty(0, dtype='uint64')
+    writer = _ChunkWriter(output_path)
+    try:
+        for chunk in iter_data(input_path, chunksize=chunksize):
+            hashes = row_hashes(chunk)
+            # Keep the first occurrence within the chunk and drop rows already seen in earlier chunks
+            keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen)
+            seen = np.union1d(seen, hashes[keep])
+            chunk = clean_data(chunk.take(np.flatnonzero(keep)), inplace=True, dedup=None)
+            if engineer:
+                chunk = engineer_features(chunk, inplace=True)
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return writer.rows
+
+class _ChunkWriter:
+    """Append DataFrame chunks to a CSV file, or to a Parquet file as one row group per chunk."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.rows = 0
+        self._started = False
+        self._parquet = None
+
+    def write(self, chunk):
+        if self.output_path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.output_path, table.schema)
+            else:
+                # Category levels may differ between chunks; the dictionary-encoded schema does not
+                table = table.cast(self._parquet.schema)
+            self._parquet.write_table(table)
+        else:
+            chunk.to_csv(self.output_path, mode='a' if self._started else 'w',
+                         header=not self._started, index=False)
+        self._started = True
+        self.rows += len(chunk)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
@@ -0,0 +1,259 @@
+"""
+DuckDB execution path for the data pipeline.
+The functions mirror load_data, clean_data, engineer_features and the eda_tools
+summaries, but run as SQL directly on CSV/Parquet files (or DataFrames), so scans are
+multi-threaded and only the selected columns and matching rows are read. Results
+match the pandas functions up to the index, which is always a fresh RangeIndex.
+DuckDB is optional: pip install duckdb
+"""
+import pandas as pd
+from src.schema import ID_COLUMN, RAW_COLUMNS, TARGET, csv_dtypes
+
+# DuckDB types for the pandas dtypes used in the schema
+SQL_TYPES = {
+    'int8': 'TINYINT',
+    'int16': 'SMALLINT',
+    'int32': 'INTEGER',
+    'int64': 'BIGINT',
+    'float32': 'FLOAT',
+    'float64': 'DOUBLE',
+    'category': 'VARCHAR',
+}
+_NUMERIC_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                  'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE')
+# Bins of engineer_features' AgeGroup (right-inclusive, like pd.cut)
+_AGE_GROUPS = [(0, 25, '18-25'), (25, 35, '26-35'), (35, 45, '36-45'), (45, 55, '46-55'), (55, 100, '55+')]
+_TRAVEL_IMPACT = {'Non-Travel': 0, 'Travel_Rarely': 1, 'Travel_Frequently': 2}
+
+def connect():
+    """Return a new in-memory DuckDB connection (raises ImportError if DuckDB is not installed)."""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError('The DuckDB backend needs the duckdb package: pip install duckdb') from e
+    con = duckdb.connect()
+    con.execute('SET enable_progress_bar = false')
+    return con
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _relation(con, source):
+    """Return a DuckDB relation over a CSV/Parquet path or a DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        return con.from_df(source)
+    if source.endswith('.parquet'):
+        return con.read_parquet(source)
+    # Parse known columns straight into their schema types, like load_data
+    types = {col: SQL_TYPES[dtype] for col, dtype in csv_dtypes().items()}
+    return con.read_csv(source, header=True, dtype=types)
+
+def _to_frame(relation):
+    """Fetch a relation as a DataFrame with the schema's categorical dtypes."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    table = relation.to_arrow_table() if hasattr(relation, 'to_arrow_table') else relation.arrow()
+    # Dictionary-encode strings in Arrow so they arrive as categoricals instead of Python str objects
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_string(column.type):
+            column = pc.dictionary_encode(column)
+        elif pa.types.is_dictionary(column.type):
+            # ENUMs use unsigned indices, which pandas cannot take
+            column = column.cast(pa.dictionary(pa.int32(), column.type.value_type))
+        columns[name] = column
+    table = pa.table(columns)
+    df = table.to_pandas()
+    for col in df.columns:
+        if col == 'AgeGroup':
+            df[col] = pd.Categorical(df[col], categories=[label for _, _, label in _AGE_GROUPS], ordered=True)
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Match astype('category'): sorted, unordered levels
+            levels = sorted(df[col].cat.categories)
+            df[col] = df[col].cat.set_categories(levels, ordered=False)
+    return df
+
+def _query(source, build_sql):
+    con = connect()
+    try:
+        con.register('src', _relation(con, source))
+        return _to_frame(con.sql(build_sql(con.sql('SELECT * FROM src'))))
+    finally:
+        con.close()
+
+def load_data(source, columns=None, where=None):
+    """
+    Load employee data with DuckDB, reading only the requested columns and rows.
+    Args:
+        source (str or pd.DataFrame): CSV or Parquet path
+        columns (list): Only read these columns
+        where (str): SQL predicate pushed down into the scan, e.g. "Department = 'Sales'"
+    Returns:
+        pd.DataFrame: Loaded data
+    """
+    def build(src):
+        select = ', '.join(_quote(col) for col in columns) if columns else '*'
+        return f'SELECT {select} FROM src' + (f' WHERE {where}' if where else '')
+    return _query(source, build)
+
+def _clean_sql(src, dedup='hash', keep_row=False):
+    """SQL of clean_data over the relation src (keep_row also selects the scan position _row)."""
+    types = dict(zip(src.columns, [str(t) for t in src.types]))
+    casts = []
+    for col in src.columns:
+        expr = _quote(col)
+        if col == TARGET:
+            if types[col] == 'VARCHAR':
+                expr = f"CASE {expr} WHEN 'Yes' THEN 1 WHEN 'No' THEN 0 END"
+            expr = target = f'CAST({expr} AS DOUBLE)'
+        elif col in RAW_COLUMNS and col != ID_COLUMN:
+            expr = f'CAST({expr} AS {SQL_TYPES[RAW_COLUMNS[col]]})'
+        casts.append(f'{expr} AS {_quote(col)}')
+    # Number rows in scan order so the first occurrence of a duplicate is kept, as in pandas
+    rows = 'SELECT *, row_number() OVER () AS _row FROM src'
+    if dedup == 'hash':
+        partition = f'hash({", ".join(_quote(col) for col in src.columns)})'
+    elif dedup == 'rows':
+        partition = ', '.join(_quote(col) for col in src.columns)
+    elif dedup == 'id':
+        partition = _quote(ID_COLUMN)
+    else:
+        partition = None
+    if partition:
+        rows = f'SELECT * FROM ({rows}) QUALIFY row_number() OVER (PARTITION BY {partition} ORDER BY _row) = 1'
+    if keep_row:
+        casts.append('_row')
+    return f'SELECT {", ".join(casts)} FROM ({rows}) WHERE {target} IS NOT NULL ORDER BY _row'
+
+def clean_data(source, dedup='hash'):
+    """
+    DuckDB version of data_processing.clean_data.
+    Args:
+        source (str or pd.DataFrame): Raw employee data (CSV/Parquet path or DataFrame)
+        dedup (str): 'hash' drops exact duplicate rows by a 64-bit row hash, 'rows' by
+            comparing all columns, 'id' keeps the first row
+            per EmployeeId and None skips duplicate removal
+    Returns:
+        pd.DataFrame: Cleaned data
+    """
+    return _query(source, lambda src: _clean_sql(src, dedup))
+
+def _features_sql(src, float32=False, table='src'):
+    """SQL of engineer_features over table, which has the columns of the relation src."""
+    float_type = 'FLOAT' if float32 else 'DOUBLE'
+
+    def ratio(num, den, nonpositive_value=None):
+        num, den = f'CAST({_quote(num)} AS DOUBLE)', f'CAST({_quote(den)} AS DOUBLE)'
+        if nonpositive_value is None:
+            expr = f'{num} / CASE WHEN {den} = 0 THEN 1.0 ELSE {den} END'
+        else:
+            expr = f'CASE WHEN {den} > 0 THEN {num} / {den} ELSE {nonpositive_value} END'
+        return f'CAST({expr} AS {float_type})'
+
+    age_group = 'CASE ' + ' '.join(f"WHEN Age > {low} AND Age <= {high} THEN '{label}'"
+                                    for low, high, label in _AGE_GROUPS) + ' END'
+    travel = ('CASE CAST(BusinessTravel AS VARCHAR) '
+              + ' '.join(f'WHEN {_literal(k)} THEN {v}' for k, v in _TRAVEL_IMPACT.items())
+              + ' END')
+    satisfaction = ['EnvironmentSatisfaction', 'JobSatisfaction', 'RelationshipSatisfaction', 'WorkLifeBalance']
+    features = {
+        'AgeGroup': age_group,
+        'TenureRatio': ratio('YearsAtCompany', 'TotalWorkingYears', nonpositive_value=0.0),
+        'OverallSatisfaction': f'CAST(({" + ".join(f"CAST({c} AS DOUBLE)" for c in satisfaction)}) / 4 AS {float_type})',
+        'SalaryToAgeRatio': f'CAST(CAST(MonthlyIncome AS DOUBLE) / Age AS {float_type})',
+        'SalaryToTenureRatio': ratio('MonthlyIncome', 'YearsAtCompany'),
+        'PromotionRate': ratio('YearsAtCompany', 'YearsSinceLastPromotion'),
+        'RoleStability': ratio('YearsInCurrentRole', 'YearsAtCompany'),
+        'TravelImpact': f'CAST({travel} AS BIGINT)',
+    }
+    existing = [col for col in features if col in src.columns]
+    exclude = f' EXCLUDE ({", ".join(_quote(c) for c in existing)})' if existing else ''
+    return f'SELECT *{exclude}, ' + ', '.join(f'{expr} AS {_quote(col)}' for col, expr in features.items()) + f' FROM {table}'
+
+def engineer_features(source, float32=False):
+    """
+    DuckDB version of feature_engineering.engineer_features.
+    Args:
+        source (str or pd.DataFrame): Cleaned employee data (CSV/Parquet path or DataFrame)
+        float32 (bool): Store the engineered ratio features as float32 instead of float64
+    Returns:
+        pd.DataFrame: Data with the engineered features added
+    """
+    return _query(source, lambda src: _features_sql(src, float32))
+
+def clean_and_engineer(source, dedup='hash', float32=False):
+    """Clean a raw CSV/Parquet file and engineer features in a single DuckDB query."""
+    def build(src):
+        features = _features_sql(src, float32, table='cleaned')
+        return (f'WITH cleaned AS ({_clean_sql(src, dedup, keep_row=True)}) '
+                f'SELECT * EXCLUDE (_row) FROM ({features}) ORDER BY _row')
+    return _query(source, build)
+
+def _numeric_columns(src):
+    return [col for col, t in zip(src.columns, src.types) if str(t) in _NUMERIC_TYPES]
+
+def _categorical_columns(src):
+    return [col for col, t in zip(src.columns, src.types)
+            if str(t) == 'VARCHAR' or str(t).startswith('ENUM')]
+
+def _summary(source, build):
+    con = connect()
+    try:
+        src = _relation(con, source)
+        return build(con, src)
+    finally:
+        con.close()
+
+def get_numeric_summary(source):
+    """DuckDB version of eda_tools.get_numeric_summary (the rows of DataFrame.describe)."""
+    def build(con, src):
+        columns = _numeric_columns(src)
+        aggregates = []
+        for col in columns:
+            c = _quote(col)
+            aggregates += [f'count({c})', f'avg({c})', f'stddev_samp({c})', f'min({c})',
+                           f'quantile_cont({c}, 0.25)', f'quantile_cont({c}, 0.5)',
+                           f'quantile_cont({c}, 0.75)', f'max({c})']
+        row = src.aggregate(', '.join(aggregates)).fetchone()
+        values = [row[i * 8:(i + 1) * 8] for i in range(len(columns))]
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame({col: [float(v) if v is not None else float('nan') for v in vals]
+                             for col, vals in zip(columns, values)}, index=index)
+    return _summary(source, build)
+
+def get_categorical_summary(source):
+    """DuckDB version of eda_tools.get_categorical_summary (count, unique, top, freq)."""
+    def build(con, src):
+        summary = {}
+        for col in _categorical_columns(src):
+            c = _quote(col)
+            count, unique = src.aggregate(f'count({c}), count(DISTINCT {c})').fetchone()
+            top = src.filter(f'{c} IS NOT NULL').aggregate(f'{c} AS value, count(*) AS n', c) \
+                .order('n DESC, value').limit(1).fetchone()
+            summary[col] = [count, unique, top[0] if top else None, top[1] if top else None]
+        return pd.DataFrame(summary, index=['count', 'unique', 'top', 'freq'], dtype=object)
+    return _summary(source, build)
+
+def get_value_counts(source):
+    """DuckDB version of eda_tools.get_value_counts."""
+    def build(con, src):
+        counts = {}
+        for col in _categorical_columns(src):
+            c = _quote(col)
+            rows = src.filter(f'{c} IS NOT NULL').aggregate(f'CAST({c} AS VARCHAR) AS value, count(*) AS n', c) \
+                .order('n DESC, value').fetchall()
+            counts[col] = pd.Series([n for _, n in rows], index=[v for v, _ in rows], name=col, dtype='int64')
+        return counts
+    return _summary(source, build)
+
+def get_missing_values(source):
+    """DuckDB version of eda_tools.get_missing_values."""
+    def build(con, src):
+        columns = src.columns
+        row = src.aggregate(', '.join(['count(*)'] + [f'count(*) - count({_quote(c)})' for c in columns])).fetchone()
+        total = pd.Series(row[1:], index=columns, dtype='int64')
+        return pd.DataFrame({'missing_count': total, 'missing_percent': total / row[0] * 100})
+    return _summary(source, build)
@@ -21,7 +21,7 @@ def plot_attrition_by_category(df, column):
 
 def create_correlation_heatmap(df):
     """Create correlation heatmap using Altair."""
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    numeric_cols = df.select_dtypes(include='number').columns
     if len(numeric_cols) == 0:
         raise ValueError("No numeric columns found in dataframe")
     corr_matrix = df[numeric_cols].corr().reset_index().melt('index')
@@ -70,11 +70,11 @@ def get_numeric_summary(df):
 
 def get_categorical_summary(df):
     """Return summary statistics for categorical columns."""
-    return df.describe(include='object')
+    return df.describe(include=['object', 'category'])
 
 def get_value_counts(df):
     """Return value counts for each categorical column as a dict."""
-    return {col: df[col].value_counts() for col in df.select_dtypes(include='object').columns}
+    return {col: df[col].value_counts() for col in df.select_dtypes(include=['object', 'category']).columns}
 
 def get_missing_values(df):
     """Return missing value counts and percentages per column as a DataFrame."""
@@ -107,7 +107,7 @@ def correlation_test(df, col1, col2, method='pearson'):
 def plot_histograms(df, numeric_cols=None):
     """Plot histograms for specified or all numeric columns using Altair."""
     if numeric_cols is None:
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        numeric_cols = df.select_dtypes(include='number').columns
     charts = {}
     for col in numeric_cols:
         chart = alt.Chart(df).mark_bar().encode(
@@ -121,7 +121,7 @@ def plot_histograms(df, numeric_cols=None):
 def plot_boxplots_by_attrition(df, numeric_cols=None, target='Attrition'):
     """Plot boxplots for numeric columns by attrition status using Altair."""
     if numeric_cols is None:
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+        numeric_cols = df.select_dtypes(include='number').columns
     charts = {}
     for col in numeric_cols:
         chart = alt.Chart(df).mark_boxplot().encode(
@@ -136,7 +136,7 @@ def plot_boxplots_by_attrition(df, numeric_cols=None, target='Attrition'):
 def plot_barplots_for_categorical(df, categorical_cols=None, target='Attrition'):
     """Plot bar plots for categorical features showing attrition counts using Altair."""
     if categorical_cols is None:
-        categorical_cols = df.select_dtypes(include='object').columns
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
     charts = {}
     for col in categorical_cols:
         if col == target:
@@ -163,7 +163,7 @@ def plot_stacked_bar_chart(df, categorical_col, target='Attrition'):
 def plot_pairplot(df, numeric_cols=None, target='Attrition'):
     """Create a scatterplot matrix (pairplot) for numeric columns colored by attrition using Altair."""
     if numeric_cols is None:
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        numeric_cols = df.select_dtypes(include='number').columns.tolist()
     charts = []
     for i, col_x in enumerate(numeric_cols):
         for j, col_y in enumerate(numeric_cols):
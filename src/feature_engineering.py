@@ -1,31 +1,89 @@
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from src.schema import CATEGORICAL_FEATURES
 
-def engineer_features(df):
-    """Create new features from existing data."""
-    df_fe = df.copy()
+def _ratio(numerator, denominator, nonpositive_value=None):
+    """
+    Divide two columns element-wise as float64 without a Python-level loop.
+    If nonpositive_value is given it is used wherever the denominator is not
+    positive; otherwise a zero denominator is treated as 1.
+    """
+    num = numerator.to_numpy(dtype='float64')
+    den = denominator.to_numpy(dtype='float64')
+    if nonpositive_value is None:
+        return num / np.where(den == 0, 1.0, den)
+    out = np.full(num.shape, nonpositive_value, dtype='float64')
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+def engineer_features(df, inplace=False, float32=False):
+    """
+    Create new features from existing data.
+    Args:
+        df (pd.DataFrame): Cleaned employee data
+        inplace (bool): Add the new columns to df itself instead of a copy
+        float32 (bool): Store the engineered ratio features as float32 instead of float64
+    Returns:
+        pd.DataFrame: DataFrame with the engineered features added
+    """
+    df_fe = df if inplace else df.copy()
+    float_dtype = 'float32' if float32 else 'float64'
     # Age groups
-    df_fe['AgeGroup'] = pd.cut(df_fe['Age'], 
+    df_fe['AgeGroup'] = pd.cut(df_fe['Age'],
                               bins=[0, 25, 35, 45, 55, 100],
                               labels=['18-25', '26-35', '36-45', '46-55', '55+'])
-    # Tenure ratio
-    df_fe['TenureRatio'] = df_fe.apply(
-        lambda x: x['YearsAtCompany'] / x['TotalWorkingYears'] if x['TotalWorkingYears'] > 0 else 0,
-        axis=1
-    )
+    # Tenure ratio (0 when there is no working history)
+    df_fe['TenureRatio'] = _ratio(df_fe['YearsAtCompany'], df_fe['TotalWorkingYears'],
+                                  nonpositive_value=0.0).astype(float_dtype, copy=False)
     # Satisfaction index
-    satisfaction_cols = ['EnvironmentSatisfaction', 'JobSatisfaction', 
+    satisfaction_cols = ['EnvironmentSatisfaction', 'JobSatisfaction',
                         'RelationshipSatisfaction', 'WorkLifeBalance']
-    df_fe['OverallSatisfaction'] = df_fe[satisfaction_cols].mean(axis=1)
+    df_fe['OverallSatisfaction'] = df_fe[satisfaction_cols].mean(axis=1).astype(float_dtype, copy=False)
     # Salary-related features
-    df_fe['SalaryToAgeRatio'] = df_fe['MonthlyIncome'] / df_fe['Age']
-    df_fe['SalaryToTenureRatio'] = df_fe['MonthlyIncome'] / df_fe['YearsAtCompany'].replace(0, 1)
+    df_fe['SalaryToAgeRatio'] = (df_fe['MonthlyIncome'] / df_fe['Age']).astype(float_dtype, copy=False)
+    df_fe['SalaryToTenureRatio'] = _ratio(df_fe['MonthlyIncome'], df_fe['YearsAtCompany']).astype(float_dtype, copy=False)
     # Career progression features
-    df_fe['PromotionRate'] = df_fe['YearsAtCompany'] / df_fe['YearsSinceLastPromotion'].replace(0, 1)
-    df_fe['RoleStability'] = df_fe['YearsInCurrentRole'] / df_fe['YearsAtCompany'].replace(0, 1)
-    # Travel impact
-    df_fe['TravelImpact'] = df_fe['BusinessTravel'].map({
+    df_fe['PromotionRate'] = _ratio(df_fe['YearsAtCompany'], df_fe['YearsSinceLastPromotion']).astype(float_dtype, copy=False)
+    df_fe['RoleStability'] = _ratio(df_fe['YearsInCurrentRole'], df_fe['YearsAtCompany']).astype(float_dtype, copy=False)
+    # Travel impact (mapping a categorical column returns a categorical; keep it numeric)
+    df_fe['TravelImpact'] = np.asarray(df_fe['BusinessTravel'].map({
         'Non-Travel': 0,
         'Travel_Rarely': 1,
         'Travel_Frequently': 2
-    })
-    return df_fe 
\ No newline at end of file
+    }))
+    return df_fe
+
+@lru_cache(maxsize=None)
+def normalize_label(value):
+    """Return the model-facing form of a category level, e.g. 'Research & Development' -> 'Research__and__Development'."""
+    return value.replace(' ', '_').replace('&', '_and_')
+
+def normalize_categoricals(df, columns=CATEGORICAL_FEATURES, inplace=False):
+    """
+    Normalize the labels of categorical columns the same way for training and serving.
+    Only the category levels are renamed (each distinct label is normalized once and
+    memoized), so the work does not grow with the number of rows and the columns
+    stay categorical.
+    Args:
+        df (pd.DataFrame): Data with the categorical columns
+        columns (list): Columns to normalize; missing ones are skipped
+        inplace (bool): Replace the columns of df itself instead of a copy
+    Returns:
+        pd.DataFrame: DataFrame with normalized categorical columns
+    """
+    df_norm = df if inplace else df.copy()
+    for col in columns:
+        if col not in df_norm.columns:
+            continue
+        values = df_norm[col]
+        if values.dtype != 'category':
+            values = values.astype('category')
+        labels = [normalize_label(str(level)) for level in values.cat.categories]
+        if len(set(labels)) == len(labels):
+            values = values.cat.rename_categories(labels)
+        else:
+            # Two levels normalize to the same label, so they have to be merged
+            values = values.map(dict(zip(values.cat.categories, labels))).astype('category')
+        df_norm[col] = values
+    return df_norm
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+import pandas as pd
+from src.data_processing import load_data, row_hashes, save_data
+from src.feature_engineering import engineer_features
+from src.schema import CATEGORICAL_FEATURES, ID_COLUMN
+
+# Engineered features for every employee, one row per EmployeeId
+FEATURE_STORE_PATH = 'data/feature_store.parquet'
+# Hash of the cleaned input row the stored features were computed from
+HASH_COLUMN = 'RowHash'
+
+def update_feature_store(df, store_path=FEATURE_STORE_PATH, prune=False):
+    """
+    Engineer features for new or changed employees only and merge them into the store.
+    An employee is recomputed when their EmployeeId is not in the store yet or the
+    hash of their cleaned input row differs from the stored one; all other rows are
+    kept as stored.
+    Args:
+        df (pd.DataFrame): Cleaned employee data (e.g. the latest monthly extract)
+        store_path (str): Parquet file holding the store; created if it does not exist
+        prune (bool): Drop stored employees that are not in df
+    Returns:
+        dict: Number of new, changed, unchanged and removed employees
+    """
+    df = df.drop_duplicates(subset=ID_COLUMN, keep='last')
+    ids = df[ID_COLUMN].to_numpy()
+    hashes = row_hashes(df)
+    stored = load_data(store_path) if os.path.exists(store_path) else None
+    if stored is None:
+        is_new = np.ones(len(df), dtype=bool)
+        is_changed = np.zeros(len(df), dtype=bool)
+    else:
+        pos = pd.Index(stored[ID_COLUMN]).get_indexer(ids)
+        is_new = pos < 0
+        is_changed = ~is_new & (stored[HASH_COLUMN].to_numpy()[pos] != hashes)
+    recompute = is_new | is_changed
+    fresh = engineer_features(df[recompute])
+    fresh[HASH_COLUMN] = hashes[recompute]
+    removed = 0
+    if stored is None:
+        merged = fresh
+    else:
+        # Keep stored rows that were not recomputed (and, with prune, are still in the extract)
+        keep = ~stored[ID_COLUMN].isin(ids[is_changed]).to_numpy()
+        if prune:
+            in_extract = stored[ID_COLUMN].isin(ids).to_numpy()
+            removed = int((~in_extract).sum())
+            keep &= in_extract
+        merged = pd.concat([stored[keep], fresh], ignore_index=True)
+        # Concatenating categoricals with different levels falls back to object
+        for col in CATEGORICAL_FEATURES:
+            if col in merged.columns and merged[col].dtype != 'category':
+                merged[col] = merged[col].astype('category')
+    if stored is None or recompute.any() or removed:
+        # Write to a temporary file first so an interrupted run leaves the old store intact
+        root, ext = os.path.splitext(store_path)
+        tmp_path = f'{root}.tmp{ext}'
+        save_data(merged, tmp_path)
+        os.replace(tmp_path, store_path)
+    return {
+        'new': int(is_new.sum()),
+        'changed': int(is_changed.sum()),
+        'unchanged': int((~recompute).sum()),
+        'removed': removed,
+    }
+
+def load_features(store_path=FEATURE_STORE_PATH, columns=None):
+    """
+    Load engineered features from the store.
+    Args:
+        store_path (str): Parquet file written by update_feature_store
+        columns (list): Only read these columns
+    Returns:
+        pd.DataFrame: Stored features without the row hash column
+    """
+    df = load_data(store_path, columns=columns)
+    return df.drop(columns=[HASH_COLUMN], errors='ignore')
@@ -1,15 +1,145 @@
-from pycaret.classification import load_model, predict_model
+import os
+import threading
 import pandas as pd
+from src.metrics import MODEL_LOAD_SECONDS, MODEL_LOADS
+from src.scoring import ScoringEngine, file_digest
 
-def predict_attrition(input_data, model_path='models/final_lda_model'):
+# Process-wide model registry: {model_path: (signature, model)}
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+# Content digests of model artifacts: {path: (signature, digest)}
+_DIGEST_CACHE = {}
+
+# Artifacts stored next to a model, as <model_path><suffix>: the PyCaret pipeline,
+# the compiled scoring engine, the preprocessed training rows and the training profile
+MODEL_SUFFIX = '.pkl'
+ENGINE_SUFFIX = '_engine.npz'
+TRAINING_SUFFIX = '_training.parquet'
+PROFILE_SUFFIX = '_profile.json'
+
+def model_artifact_file(model_path, suffix=MODEL_SUFFIX):
+    """Return the path of a model's artifact (one of the suffixes above); model_path may end in .pkl."""
+    if model_path.endswith(MODEL_SUFFIX):
+        model_path = model_path[:-len(MODEL_SUFFIX)]
+    return f'{model_path}{suffix}'
+
+def _file_signature(path):
+    """Return (mtime_ns, size) of a file, which changes whenever it is rewritten."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def get_model_signature(model_path='models/final_lda_model'):
+    """
+    Return a signature identifying the current version of a saved model.
+    The signature changes whenever the artifact is rewritten (mtime or size),
+    so it can be used as a model version for cache keys.
+    """
+    return _file_signature(model_artifact_file(model_path))
+
+def get_model_digest(model_path='models/final_lda_model'):
+    """Return the SHA-256 of the saved model file, rehashed only when its signature changes."""
+    path = model_artifact_file(model_path)
+    signature = _file_signature(path)
+    cached = _DIGEST_CACHE.get(path)
+    if cached is None or cached[0] != signature:
+        cached = (signature, file_digest(path))
+        _DIGEST_CACHE[path] = cached
+    return cached[1]
+
+def get_serving_version(model_path='models/final_lda_model'):
+    """
+    Return a version for whatever predict_attrition currently serves for model_path.
+    It combines the signatures of the compiled engine and the PyCaret artifact, so it
+    changes when either file is rewritten; missing files contribute None.
+    """
+    signatures = []
+    for path in (model_artifact_file(model_path, ENGINE_SUFFIX), model_artifact_file(model_path)):
+        signatures.append(_file_signature(path) if os.path.exists(path) else None)
+    return tuple(signatures)
+
+def _get_cached(key, artifact, loader, kind):
+    """
+    Return loader() for key, calling it at most once per version of the artifact file.
+    The artifact is reloaded when its signature changes on disk, and the new object
+    replaces the old one atomically so concurrent callers always see a complete model.
+    """
+    signature = _file_signature(artifact)
+    cached = _MODEL_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _MODEL_CACHE_LOCK:
+        # Another thread may have reloaded the model while we waited for the lock
+        cached = _MODEL_CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with MODEL_LOAD_SECONDS.time(kind=kind):
+            obj = loader()
+        MODEL_LOADS.inc(kind=kind)
+        _MODEL_CACHE[key] = (signature, obj)
+        return obj
+
+def get_model(model_path='models/final_lda_model'):
+    """
+    Return the loaded PyCaret model for model_path, loading it at most once per version.
+    PyCaret is only imported here, so processes serving a compiled engine never load it.
+    """
+    def load():
+        from pycaret.classification import load_model
+        return load_model(model_path, verbose=False)
+    return _get_cached(model_path, model_artifact_file(model_path), load, 'pycaret')
+
+def get_scoring_engine(model_path='models/final_lda_model', float32=False):
+    """
+    Return the compiled scoring engine exported for model_path, or None if there is none.
+    Like get_model, the engine is cached per process and reloaded when its file changes.
+    With float32 the engine computes in float32 (cached separately from the float64 one).
+    When the PyCaret artifact is present, an engine compiled from a different version
+    of it (e.g. after the model was retrained and saved again) is stale and ignored.
+    """
+    path = model_artifact_file(model_path, ENGINE_SUFFIX)
+    if not os.path.exists(path):
+        return None
+    dtype = 'float32' if float32 else 'float64'
+    key = path if dtype == 'float64' else f'{path}:{dtype}'
+    engine = _get_cached(key, path, lambda: ScoringEngine.load(path, dtype=dtype), 'engine')
+    if os.path.exists(model_artifact_file(model_path)) and engine.model_digest != get_model_digest(model_path):
+        return None
+    return engine
+
+def clear_model_cache():
+    """Drop all cached models so the next call reloads them from disk."""
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
+        _DIGEST_CACHE.clear()
+
+def preload_model(model_path='models/final_lda_model', float32=False):
+    """
+    Load the serving model into the process-wide cache ahead of the first request.
+    The compiled scoring engine is preferred; without one, PyCaret and the pickled
+    pipeline are loaded instead. Call this before forking workers so they share it.
+    """
+    if get_scoring_engine(model_path, float32=float32) is None:
+        get_model(model_path)
+
+def predict_attrition(input_data, model_path='models/final_lda_model', use_engine=True, float32=False):
     """
-    Load the saved LDA model and make predictions on new data.
+    Make predictions on new data with the saved LDA model.
+    The model is served from the process-wide cache and hot-reloaded when the
+    artifact on disk changes. If a compiled scoring engine was exported next to the
+    model (see src.modeling.export_scoring_engine) it is used instead of predict_model.
     Args:
         input_data (pd.DataFrame): DataFrame with the same features as used in training (no Attrition or EmployeeId)
         model_path (str): Path to the saved model
+        use_engine (bool): Use the compiled scoring engine when one is available
+        float32 (bool): Score in float32 with the compiled engine (ignored by the PyCaret path,
+            which always promotes to float64); see src.modeling.check_float32_parity
     Returns:
         pd.DataFrame: DataFrame with predictions and probabilities
     """
-    model = load_model(model_path)
+    engine = get_scoring_engine(model_path, float32=float32) if use_engine else None
+    if engine is not None:
+        return engine.predict(input_data)
+    from pycaret.classification import predict_model
+    model = get_model(model_path)
     predictions = predict_model(model, data=input_data)
-    return predictions 
\ No newline at end of file
+    return predictions
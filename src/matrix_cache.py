@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.data_processing import dataset_fingerprint
+from src.inference import get_model, get_model_signature
+from src.schema import ID_COLUMN, TARGET
+
+# Preprocessed matrices are stored as <cache_dir>/<key>.npy with the column names in <key>.json
+MATRIX_CACHE_DIR = 'data/matrix_cache'
+
+def matrix_cache_key(data, model_path='models/final_lda_model', dtype='float64'):
+    """Return the cache key for the preprocessed matrix of data under the current version of a model."""
+    digest = hashlib.sha256()
+    digest.update(dataset_fingerprint(data).encode('utf-8'))
+    digest.update(repr((get_model_signature(model_path), np.dtype(dtype).str)).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+def _model_inputs(data):
+    return data.drop(columns=[c for c in [TARGET, ID_COLUMN] if c in data.columns])
+
+def load_feature_matrix(data, model_path='models/final_lda_model', cache_dir=MATRIX_CACHE_DIR,
+                        dtype='float64', chunksize=100_000):
+    """
+    Return the fully preprocessed model input for data, memory-mapped from the cache.
+    The matrix is what the saved pipeline feeds its estimator (after imputation,
+    encoding, normalization and feature selection). It is computed once per dataset
+    and model version, written chunk by chunk to a .npy file, and every later call
+    maps that file (copy-on-write) instead of running the pipeline again.
+    Args:
+        data (pd.DataFrame): Engineered features; Attrition and EmployeeId are ignored
+        model_path (str): Path the model was saved to with save_trained_model
+        cache_dir (str): Directory holding the cached matrices
+        dtype (str): dtype of the stored matrix
+        chunksize (int): Rows transformed at a time when the matrix is built
+    Returns:
+        pd.DataFrame: Preprocessed features backed by the memory map
+    """
+    key = matrix_cache_key(data, model_path, dtype)
+    matrix_path = os.path.join(cache_dir, f'{key}.npy')
+    columns_path = os.path.join(cache_dir, f'{key}.json')
+    if not os.path.exists(matrix_path):
+        _build_feature_matrix(_model_inputs(data), model_path, matrix_path, columns_path, dtype, chunksize)
+    with open(columns_path, encoding='utf-8') as f:
+        columns = json.load(f)['columns']
+    # Copy-on-write: pages are read from the file on demand and writes never reach it
+    matrix = np.load(matrix_path, mmap_mode='c')
+    return pd.DataFrame(matrix, columns=columns, copy=False)
+
+def _build_feature_matrix(X, model_path, matrix_path, columns_path, dtype, chunksize):
+    """Transform X with the model's preprocessing steps into a .npy file, one chunk at a time."""
+    os.makedirs(os.path.dirname(matrix_path) or '.', exist_ok=True)
+    preprocess = get_model(model_path)[:-1]
+    tmp_path = f'{matrix_path}.tmp.npy'
+    matrix = None
+    for start in range(0, max(len(X), 1), chunksize):
+        chunk = preprocess.transform(X.iloc[start:start + chunksize])
+        if matrix is None:
+            columns = [str(col) for col in chunk.columns]
+            matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(len(X), len(columns)))
+        matrix[start:start + len(chunk)] = chunk.to_numpy(dtype=dtype)
+    matrix.flush()
+    del matrix
+    with open(columns_path, 'w', encoding='utf-8') as f:
+        json.dump({'columns': columns, 'model': model_path, 'rows': len(X)}, f)
+    # The .npy file appears last, so a present matrix always has its column names
+    os.replace(tmp_path, matrix_path)
+
+def predict_proba_from_matrix(matrix, model_path='models/final_lda_model'):
+    """
+    Return the positive-class probability for every row of a cached feature matrix.
+    Only the final estimator runs, so repeat scoring and threshold sweeps skip preprocessing.
+    """
+    estimator = get_model(model_path).steps[-1][1]
+    return estimator.predict_proba(matrix)[:, -1]
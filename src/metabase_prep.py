@@ -1,4 +1,5 @@
 import pandas as pd
+import pyarrow.parquet as pq
 import sqlite3
 import os
 
@@ -11,8 +12,8 @@ if os.getcwd() != project_root:
 # --- CONFIGURATION ---
 # Path to SHAP feature importance CSV
 shap_csv = 'results/shap_feature_importance.csv'
-# Path to your base (feature-engineered) data
-base_data_csv = 'data/employee_data_features.csv'
+# Path to your base (feature-engineered) data: the feature store
+base_data_path = 'data/feature_store.parquet'
 # Output SQLite database path
 sqlite_db = 'results/feature_monitor.db'
 # Name of the table to create/update
@@ -24,12 +25,11 @@ extra_columns = ['Attrition']  # Add more if needed
 shap_importance = pd.read_csv(shap_csv)
 top_features = shap_importance['Feature'].tolist()  # Use all, or .head(N) for top N
 
-# --- LOAD BASE DATA ---
-df = pd.read_csv(base_data_csv)
-
-# --- SELECT IMPORTANT VARIABLES (+ TARGET) ---
-selected_columns = [col for col in top_features if col in df.columns] + [col for col in extra_columns if col in df.columns]
-df_selected = df[selected_columns]
+# --- LOAD SELECTED VARIABLES (+ TARGET) ---
+# Only the selected columns are read from the Parquet file
+available = set(pq.read_schema(base_data_path).names)
+selected_columns = [col for col in top_features if col in available] + [col for col in extra_columns if col in available]
+df_selected = pd.read_parquet(base_data_path, columns=selected_columns)
 
 # --- SAVE TO SQLITE ---
 os.makedirs(os.path.dirname(sqlite_db), exist_ok=True)
@@ -0,0 +1,102 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from 100 microseconds to 10 seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Batch size buckets in rows
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+_REGISTRY = []
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+class Counter:
+    """Monotonic counter exported in Prometheus text format."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(key)} {value}')
+        return lines
+
+class Histogram:
+    """Cumulative histogram exported in Prometheus text format."""
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # {label key: [per-bucket counts..., +Inf count, sum]}
+        self._values = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time spent in the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f'{self.name}_bucket{_format_labels(key + (("le", repr(float(bound))),))} {count}')
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", "+Inf"),))} {state[len(self.buckets)]}')
+                lines.append(f'{self.name}_sum{_format_labels(key)} {state[-1]}')
+                lines.append(f'{self.name}_count{_format_labels(key)} {state[len(self.buckets)]}')
+        return lines
+
+def render_metrics():
+    """Return every registered metric in Prometheus text exposition format."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+STAGE_SECONDS = Histogram('attrition_stage_seconds', 'Time spent in each stage of a prediction request.',
+                          labelnames=('stage',))
+REQUEST_SECONDS = Histogram('attrition_request_seconds', 'End-to-end request latency.',
+                            labelnames=('endpoint',))
+BATCH_ROWS = Histogram('attrition_batch_rows', 'Rows per request and per model call.',
+                       buckets=BATCH_BUCKETS, labelnames=('kind',))
+MODEL_LOADS = Counter('attrition_model_loads_total', 'Models loaded from disk, by artifact kind.',
+                      labelnames=('kind',))
+MODEL_LOAD_SECONDS = Histogram('attrition_model_load_seconds', 'Time spent loading a model from disk.',
+                               labelnames=('kind',))
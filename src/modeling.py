@@ -1,37 +1,34 @@
-from pycaret.classification import setup, create_model, tune_model, evaluate_model, plot_model, pull, save_model, load_model, predict_model
+from pycaret.classification import setup, create_model, tune_model, evaluate_model, plot_model, pull, save_model, load_model, predict_model, get_config, save_experiment, load_experiment
+import copy
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import time
+from contextlib import nullcontext
+import numpy as np
 import pandas as pd
+from src.data_processing import dataset_fingerprint
+from src.feature_engineering import normalize_categoricals
+from src.profiling import package_versions
+from src.schema import ORDINAL_FEATURES, pycaret_feature_spec
+from src.inference import ENGINE_SUFFIX, PROFILE_SUFFIX, TRAINING_SUFFIX, get_model_digest, model_artifact_file
+from src.scoring import FLOAT32_ATOL, compile_scoring_engine
 
-def setup_modeling(df, target='Attrition', session_id=123):
-    """Setup PyCaret classification environment."""
-    # Drop EmployeeId if it exists
-    if 'EmployeeId' in df.columns:
-        df = df.drop('EmployeeId', axis=1)
-        
-    clf = setup(
-        data=df,
+# Fitted setup_modeling experiments are cached here as <key>.pkl (experiment) and <key>.data.pkl (data)
+SETUP_CACHE_DIR = 'models/setup_cache'
+# Least recently used entries beyond this many are deleted when a new one is written
+SETUP_CACHE_MAX_ENTRIES = 8
+# Packages whose pickled objects the cached experiment holds; any upgrade invalidates the cache
+SETUP_CACHE_PACKAGES = ('pycaret', 'scikit-learn', 'imbalanced-learn', 'lightgbm', 'numpy', 'pandas')
+
+def _setup_config(target, session_id):
+    """Return the keyword arguments setup_modeling passes to PyCaret setup (besides data)."""
+    return dict(
         target=target,
-        numeric_features=['Age', 'DailyRate', 'DistanceFromHome', 'HourlyRate',
-                        'MonthlyIncome', 'MonthlyRate', 'NumCompaniesWorked',
-                        'PercentSalaryHike', 'StandardHours', 'TotalWorkingYears',
-                        'TrainingTimesLastYear', 'YearsAtCompany', 'YearsInCurrentRole',
-                        'YearsSinceLastPromotion', 'YearsWithCurrManager',
-                        'TenureRatio', 'OverallSatisfaction', 'SalaryToAgeRatio',
-                        'SalaryToTenureRatio', 'PromotionRate', 'RoleStability',
-                        'TravelImpact'],
-        categorical_features=['BusinessTravel', 'Department', 'EducationField',
-                            'Gender', 'JobRole', 'MaritalStatus', 'Over18',
-                            'OverTime', 'AgeGroup'],
-        ordinal_features={
-            'Education': [1, 2, 3, 4, 5],
-            'EnvironmentSatisfaction': [1, 2, 3, 4],
-            'JobInvolvement': [1, 2, 3, 4],
-            'JobLevel': [1, 2, 3, 4, 5],
-            'JobSatisfaction': [1, 2, 3, 4],
-            'PerformanceRating': [1, 2, 3, 4],
-            'RelationshipSatisfaction': [1, 2, 3, 4],
-            'StockOptionLevel': [0, 1, 2, 3],
-            'WorkLifeBalance': [1, 2, 3, 4]
-        },
+        **pycaret_feature_spec(),
         encoding_method='onehot',
         max_encoding_ohe=10,
         rare_to_value=0.05,
@@ -47,13 +44,398 @@ def setup_modeling(df, target='Attrition', session_id=123):
         verbose=False,
         memory=False
     )
+
+def setup_cache_key(df, config):
+    """
+    Return the content address of a setup run: a hash of the data, the setup arguments
+    and the versions of SETUP_CACHE_PACKAGES.
+    """
+    digest = hashlib.sha256()
+    digest.update(dataset_fingerprint(df).encode('utf-8'))
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(json.dumps(package_versions(SETUP_CACHE_PACKAGES), sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+def prune_setup_cache(cache_dir, max_entries=SETUP_CACHE_MAX_ENTRIES):
+    """
+    Delete all but the max_entries most recently used entries of a setup cache
+    (cache hits refresh an entry's modification time). Returns the removed keys.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = [name[:-len('.pkl')] for name in os.listdir(cache_dir)
+               if name.endswith('.pkl') and not name.endswith('.data.pkl')]
+    entries.sort(key=lambda key: os.path.getmtime(os.path.join(cache_dir, f'{key}.pkl')), reverse=True)
+    removed = entries[max_entries:]
+    for key in removed:
+        # Experiment first, so a partly removed entry is never treated as a hit
+        for path in (f'{key}.pkl', f'{key}.data.pkl'):
+            try:
+                os.remove(os.path.join(cache_dir, path))
+            except FileNotFoundError:
+                pass
+    return removed
+
+def _phase(profiler, name, children=False, **labels):
+    """Return profiler.phase(name, children=..., **labels), or a no-op context when profiling is off."""
+    return nullcontext() if profiler is None else profiler.phase(name, children=children, **labels)
+
+def _profile_pipeline(profiler, pipeline, X, y, **labels):
+    """Fit an unfitted pipeline one step at a time, recording every step as a phase named after it."""
+    last = len(pipeline.steps) - 1
+    for i, (name, step) in enumerate(pipeline.steps):
+        with profiler.phase(name, **labels):
+            step.fit(X, y)
+            if i < last:
+                # PyCaret's wrappers return (X, y); the balance step resamples both
+                out = step.transform(X, y)
+                X, y = out if isinstance(out, tuple) else (out, y)
+    return pipeline
+
+def profile_setup_pipeline(profiler):
+    """
+    Refit the current setup's preprocessing step by step on the training split,
+    recording imputation, encoding, SMOTE, normalization and feature selection as
+    separate phases (PyCaret setup only reports them together).
+    """
+    from sklearn.base import clone
+    _profile_pipeline(profiler, clone(get_config('pipeline')), get_config('X_train'), get_config('y_train'),
+                      stage='setup')
+
+def profile_cv_folds(profiler, estimator):
+    """
+    Cross-validate estimator with the current setup's folds, refitting the whole
+    pipeline in each fold like create_model and tune_model do, and record every
+    pipeline step and the validation predict as phases labelled with the fold.
+    """
+    from sklearn.base import clone
+    X, y = get_config('X_train'), get_config('y_train')
+    for fold, (train, test) in enumerate(get_config('fold_generator').split(X, y)):
+        pipeline = clone(get_config('pipeline'))
+        pipeline.steps.append(('actual_estimator', clone(estimator)))
+        _profile_pipeline(profiler, pipeline, X.iloc[train], y.iloc[train], stage='cv', fold=fold)
+        with profiler.phase('predict', stage='cv', fold=fold):
+            pipeline.predict(X.iloc[test])
+
+def setup_modeling(df, target='Attrition', session_id=123, cache_dir=None, profiler=None, profile=False):
+    """
+    Setup PyCaret classification environment.
+    With cache_dir, the fitted experiment (train/test split, folds, fitted imputers,
+    encoders, scaler, SMOTE and selected features) is stored under a key derived from
+    the data and the setup arguments. A later call with the same data and arguments
+    restores it with load_experiment instead of refitting the preprocessing.
+    Args:
+        df (pd.DataFrame): Engineered features with the target
+        target (str): Target column
+        session_id (int): PyCaret seed
+        cache_dir (str): Directory of the setup cache (e.g. SETUP_CACHE_DIR); None disables it
+        profiler (PhaseProfiler): Record the setup (or the cache load)
+        profile (bool): With profiler, also refit the preprocessing step by step to record
+            each step (see profile_setup_pipeline); skipped on a cache hit
+    Returns:
+        The PyCaret experiment, also set as the current one for the functional API
+    """
+    # Drop EmployeeId if it exists
+    if 'EmployeeId' in df.columns:
+        df = df.drop('EmployeeId', axis=1)
+    config = _setup_config(target, session_id)
+    clf, cached = _setup_or_load(df, config, cache_dir, profiler)
+    # A cache hit fitted nothing, so there are no preprocessing steps to profile
+    if profile and profiler is not None and not cached:
+        profile_setup_pipeline(profiler)
     return clf
 
-def train_and_tune_model(model_name='lda', optimize='Recall', n_iter=50):
-    """Create and tune a model."""
-    best_model = create_model(model_name, verbose=False)
-    tuned_model = tune_model(best_model, optimize=optimize, n_iter=n_iter, verbose=False)
-    return tuned_model
+def _setup_or_load(df, config, cache_dir, profiler):
+    """Run or restore setup, returning (experiment, whether it came from the cache)."""
+    if cache_dir is None:
+        with _phase(profiler, 'setup', cached=False):
+            return setup(data=df, **config), False
+    key = setup_cache_key(df, config)
+    experiment_path = os.path.join(cache_dir, f'{key}.pkl')
+    data_path = os.path.join(cache_dir, f'{key}.data.pkl')
+    if os.path.exists(experiment_path) and os.path.exists(data_path):
+        os.utime(experiment_path)
+        with _phase(profiler, 'setup', cached=True):
+            return load_experiment(experiment_path, data=pd.read_pickle(data_path), preprocess_data=False), True
+    with _phase(profiler, 'setup', cached=False):
+        clf = setup(data=df, **config)
+    os.makedirs(cache_dir, exist_ok=True)
+    # The experiment is written last (atomically), so its presence marks a complete entry
+    pd.to_pickle(clf.data, data_path)
+    tmp_path = f'{experiment_path}.tmp'
+    save_experiment(tmp_path)
+    os.replace(tmp_path, experiment_path)
+    prune_setup_cache(cache_dir)
+    return clf, False
+
+# Candidate estimators for compare_candidates, by PyCaret model ID: (module, class, params).
+# Modules are imported in the worker, so missing optional packages only mark their row unavailable.
+CANDIDATE_MODELS = {
+    'lda': ('sklearn.discriminant_analysis', 'LinearDiscriminantAnalysis', {}),
+    'lr': ('sklearn.linear_model', 'LogisticRegression', {'max_iter': 1000}),
+    'rf': ('sklearn.ensemble', 'RandomForestClassifier', {'n_estimators': 200, 'n_jobs': 1}),
+    'mlp': ('sklearn.neural_network', 'MLPClassifier', {'max_iter': 500}),
+    'lightgbm': ('lightgbm', 'LGBMClassifier', {'n_jobs': 1, 'verbose': -1}),
+    'xgboost': ('xgboost', 'XGBClassifier', {'n_jobs': 1, 'eval_metric': 'logloss'}),
+    'catboost': ('catboost', 'CatBoostClassifier', {'thread_count': 1, 'verbose': 0}),
+}
+LEADERBOARD_METRICS = ['Accuracy', 'AUC', 'Recall', 'Prec.', 'F1']
+
+def _make_candidate(name, seed):
+    """Instantiate a CANDIDATE_MODELS entry, seeding it when the estimator takes a random_state."""
+    module, cls, params = CANDIDATE_MODELS[name]
+    estimator = getattr(importlib.import_module(module), cls)(**params)
+    if 'random_state' in estimator.get_params():
+        estimator.set_params(random_state=seed)
+    return estimator
+
+def _preprocess_folds(fix_imbalance):
+    """
+    Fit a fresh copy of the setup pipeline inside every training fold, as create_model does.
+    Returns (X_fit, y_fit, X_valid, y_valid) arrays per fold, with X_fit/y_fit
+    oversampled by the pipeline's SMOTE step unless fix_imbalance is off.
+    """
+    from sklearn.base import clone
+    X, y = get_config('X_train'), get_config('y_train')
+    folds = []
+    for train_idx, valid_idx in get_config('fold_generator').split(X, y):
+        pipeline = clone(get_config('pipeline'))
+        if not fix_imbalance:
+            pipeline.steps = [step for step in pipeline.steps if step[0] != 'balance']
+        X_fit, y_fit = pipeline.fit_transform(X.iloc[train_idx], y.iloc[train_idx])
+        X_valid = pipeline.transform(X.iloc[valid_idx])
+        folds.append((np.asarray(X_fit, dtype='float64'), np.asarray(y_fit),
+                      np.asarray(X_valid, dtype='float64'), np.asarray(y.iloc[valid_idx])))
+    return folds
+
+def _cross_validate_candidate(name, folds, seed):
+    """Cross-validate one candidate on the per-fold preprocessed matrices and return its mean fold metrics."""
+    from sklearn.base import clone
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+    start = time.perf_counter()
+    estimator = _make_candidate(name, seed)
+    scores = {metric: [] for metric in LEADERBOARD_METRICS}
+    for X_fit, y_fit, X_valid, y_valid in folds:
+        model = clone(estimator).fit(X_fit, y_fit)
+        pred = model.predict(X_valid)
+        proba = model.predict_proba(X_valid)[:, -1]
+        scores['Accuracy'].append(accuracy_score(y_valid, pred))
+        scores['AUC'].append(roc_auc_score(y_valid, proba))
+        scores['Recall'].append(recall_score(y_valid, pred, zero_division=0))
+        scores['Prec.'].append(precision_score(y_valid, pred, zero_division=0))
+        scores['F1'].append(f1_score(y_valid, pred, zero_division=0))
+    result = {metric: float(np.mean(values)) for metric, values in scores.items()}
+    result['TT (Sec)'] = round(time.perf_counter() - start, 2)
+    return result
+
+# Seconds between checks for workers that exited without posting a result
+WORKER_POLL_SECONDS = 1.0
+
+def _candidate_worker(name, folds, seed, results):
+    try:
+        results.put((name, 'ok', _cross_validate_candidate(name, folds, seed)))
+    except ImportError as e:
+        results.put((name, 'unavailable', str(e)))
+    except Exception as e:
+        results.put((name, 'failed', f'{type(e).__name__}: {e}'))
+
+def compare_candidates(model_names=('lda', 'lr', 'rf', 'mlp', 'lightgbm', 'xgboost', 'catboost'),
+                       budget=600, n_jobs=None, fix_imbalance=True, sort='Recall'):
+    """
+    Cross-validate several estimators concurrently and rank them on Recall.
+    Must be called after setup_modeling. For each of setup's CV folds, a fresh copy
+    of the setup pipeline (imputation, encoding, SMOTE, scaling, feature selection)
+    is fitted on the training rows only and transforms the validation rows, so the
+    scores are comparable with create_model's CV. These fold matrices are computed
+    once and shared by all candidates. Candidates run in separate worker processes,
+    at most n_jobs at a time; when the wall-clock budget (which includes the fold
+    preprocessing) runs out, running workers are terminated and the remaining
+    candidates are skipped.
+    Args:
+        model_names (iterable): Keys of CANDIDATE_MODELS (PyCaret model IDs)
+        budget (float): Wall-clock limit in seconds for the whole comparison
+        n_jobs (int): Concurrent worker processes (defaults to the CPU count)
+        fix_imbalance (bool): Keep the pipeline's SMOTE step in each training fold (matches setup_modeling)
+        sort (str): Leaderboard metric to rank on, highest first
+    Returns:
+        pd.DataFrame: Leaderboard indexed by model ID with mean fold metrics, training
+            time and a Status column ('ok', 'timeout', 'skipped', 'unavailable', 'failed'
+            or 'crashed' when a worker exits without a result)
+    """
+    unknown = [name for name in model_names if name not in CANDIDATE_MODELS]
+    if unknown:
+        raise ValueError(f"Unknown candidate models {unknown}, expected some of {sorted(CANDIDATE_MODELS)}")
+    seed = get_config('seed')
+    deadline = time.monotonic() + budget
+    folds = _preprocess_folds(fix_imbalance)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    # Fork so workers inherit the fold matrices instead of receiving pickled copies
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    results = context.Queue()
+    pending = list(model_names)
+    running = {}
+    rows = {name: {'Status': 'skipped'} for name in model_names}
+    def record(name, status, payload):
+        running.pop(name).join()
+        rows[name] = {**payload, 'Status': status} if status == 'ok' else {'Status': status, 'Error': payload}
+    while pending or running:
+        while pending and len(running) < n_jobs:
+            name = pending.pop(0)
+            worker = context.Process(target=_candidate_worker,
+                                     args=(name, folds, seed, results), daemon=True)
+            worker.start()
+            running[name] = worker
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            record(*results.get(timeout=min(remaining, WORKER_POLL_SECONDS)))
+        except queue.Empty:
+            # A worker that exited without posting a result crashed (killed, out of memory, segfault)
+            exited = [name for name, worker in running.items() if worker.exitcode is not None]
+            # Results are flushed before a worker exits, so drain them before declaring a crash
+            while True:
+                try:
+                    record(*results.get_nowait())
+                except queue.Empty:
+                    break
+            for name in exited:
+                if name in running:
+                    worker = running.pop(name)
+                    worker.join()
+                    rows[name] = {'Status': 'crashed', 'Error': f'exit code {worker.exitcode}'}
+    # Budget exhausted: stop stragglers; candidates never started stay 'skipped'
+    for name, worker in running.items():
+        worker.terminate()
+        worker.join()
+        rows[name] = {'Status': 'timeout'}
+    leaderboard = pd.DataFrame.from_dict(rows, orient='index')
+    leaderboard = leaderboard.reindex(columns=LEADERBOARD_METRICS + ['TT (Sec)', 'Status']
+                                      + (['Error'] if 'Error' in leaderboard.columns else []))
+    leaderboard.index.name = 'Model'
+    return leaderboard.sort_values(sort, ascending=False, na_position='last')
+
+# sklearn scorer names for the PyCaret metrics (by name) train_and_tune_model can optimize
+SEARCH_SCORERS = {'Accuracy': 'accuracy', 'AUC': 'roc_auc', 'Recall': 'recall', 'Precision': 'precision', 'F1': 'f1'}
+
+def _search_metric(optimize):
+    """
+    Return the current experiment's metric container for optimize, given as a PyCaret
+    metric ID, name or display name (e.g. 'precision', 'Precision' or 'Prec.').
+    """
+    from pycaret.classification import get_current_experiment
+    metric = get_current_experiment()._get_metric_by_name_or_id(optimize)
+    if metric is None or metric.name not in SEARCH_SCORERS:
+        raise ValueError(f"optimize must name one of {sorted(SEARCH_SCORERS)}, got {optimize!r}")
+    return metric
+
+def train_and_tune_model(model_name='lda', optimize='Recall', n_iter=50, search='random',
+                         halving_factor=3, n_jobs=-1, compare_flat=False, report=False, profiler=None,
+                         profile=False):
+    """
+    Create and tune a model.
+    search='random' runs PyCaret's tune_model (a flat random search that cross-validates
+    every candidate on the full training split). search='halving' runs a successive
+    halving search over the same PyCaret grid: all n_iter candidates are cross-validated
+    on a small sample of the training split, and only the best 1/halving_factor of them
+    move on to a halving_factor times larger sample, sized so that the last round uses
+    (almost) the full training split. The best candidate of that round is trained with
+    create_model. Trials within a round run in parallel (n_jobs).
+    Args:
+        model_name (str): PyCaret model ID
+        optimize (str): Metric to optimize, one of SEARCH_SCORERS (or its PyCaret ID or display name)
+        n_iter (int): Number of candidate configurations
+        search (str): 'random' or 'halving'
+        halving_factor (int): Share of candidates kept (1/factor) and growth of the sample per round
+        n_jobs (int): Parallel trials for the halving search
+        compare_flat (bool): Also run the flat search to measure the time saved
+        report (bool): Also return a search report
+        profiler (PhaseProfiler): Record create_model and the search
+        profile (bool): With profiler, also cross-validate the tuned model once more to
+            record every pipeline step of every fold (see profile_cv_folds)
+    Returns:
+        The tuned model, or (model, report) if report is set
+    """
+    if search not in ('random', 'halving'):
+        raise ValueError(f"search must be 'random' or 'halving', got {search!r}")
+    # Resolved before any training, so a bad name fails fast
+    metric = _search_metric(optimize)
+    # The CV score of the returned model is only read back from pull() for the report
+    score_models = report or compare_flat
+    profile_folds = profile and profiler is not None
+    # PyCaret's create_model and tune_model run folds in setup's worker processes
+    pycaret_workers = get_config('n_jobs_param') != 1
+    search_report = {'search': search, 'n_iter': n_iter}
+    if search == 'random' or compare_flat:
+        start = time.perf_counter()
+        with _phase(profiler, 'create_model', children=pycaret_workers):
+            best_model = create_model(model_name, verbose=False)
+        with _phase(profiler, 'tune_model', children=pycaret_workers, n_iter=n_iter):
+            flat_model = tune_model(best_model, optimize=metric.name, n_iter=n_iter, verbose=False)
+        search_report['flat_seconds'] = round(time.perf_counter() - start, 2)
+        if score_models:
+            search_report[f'flat_{metric.name}'] = float(pull().loc['Mean', metric.display_name])
+        if search == 'random':
+            if profile_folds:
+                profile_cv_folds(profiler, flat_model)
+            return (flat_model, search_report) if report else flat_model
+    start = time.perf_counter()
+    with _phase(profiler, 'halving_search', children=n_jobs != 1, n_iter=n_iter):
+        params, halving = _halving_search(model_name, metric.name, n_iter, halving_factor, n_jobs)
+    with _phase(profiler, 'create_model', children=pycaret_workers):
+        tuned_model = create_model(model_name, verbose=False, **params)
+    search_report['halving_seconds'] = round(time.perf_counter() - start, 2)
+    if score_models:
+        search_report[f'halving_{metric.name}'] = float(pull().loc['Mean', metric.display_name])
+    search_report.update({
+        'best_params': params,
+        'rounds': int(halving.n_iterations_),
+        'candidates_per_round': [int(n) for n in halving.n_candidates_],
+        'rows_per_round': [int(n) for n in halving.n_resources_],
+    })
+    if compare_flat:
+        search_report['time_saved_seconds'] = round(search_report['flat_seconds'] - search_report['halving_seconds'], 2)
+    if profile_folds:
+        profile_cv_folds(profiler, tuned_model)
+    return (tuned_model, search_report) if report else tuned_model
+
+def _halving_search(model_name, optimize, n_iter, factor, n_jobs):
+    """
+    Run a HalvingRandomSearchCV over PyCaret's tuning grid for model_name.
+    The first sample is the largest one from which factor-fold growth still fits in
+    the training split, so the last round ends within factor**(rounds-1) rows of it,
+    and never smaller than SMOTE needs. Extra rounds needed to cut n_iter candidates
+    down are run at the first sample size (aggressive elimination).
+    Returns:
+        tuple: Best parameters and the fitted search
+    """
+    from sklearn.base import clone
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV
+    from pycaret.classification import get_current_experiment
+    container = get_current_experiment()._all_models_internal[model_name]
+    # The full setup pipeline (including SMOTE) is refitted inside every fold, like tune_model
+    pipeline = clone(get_config('pipeline'))
+    pipeline.steps.append(('actual_estimator', container.class_def(**container.args)))
+    distributions = {f'actual_estimator__{name}': values for name, values in container.tune_grid.items()}
+    X, y = get_config('X_train'), get_config('y_train')
+    folds = get_config('fold_generator')
+    # Smallest sample that still leaves SMOTE enough minority rows (k_neighbors=5) in every training fold
+    minority_share = y.value_counts(normalize=True).min()
+    min_rows = min(int(np.ceil(12 / (minority_share * (1 - 1 / folds.get_n_splits())))), len(X))
+    # Rounds of factor-fold growth from min_rows that fit in the split, then the largest start for that many
+    rounds = 1
+    while min_rows * factor**rounds <= len(X):
+        rounds += 1
+    min_resources = max(min_rows, len(X) // factor**(rounds - 1))
+    halving = HalvingRandomSearchCV(
+        pipeline, distributions, n_candidates=n_iter, factor=factor,
+        min_resources=min_resources, max_resources=len(X), aggressive_elimination=True,
+        scoring=SEARCH_SCORERS[optimize], cv=folds, n_jobs=n_jobs,
+        random_state=get_config('seed'), refit=False, error_score=np.nan)
+    halving.fit(X, y)
+    params = {name[len('actual_estimator__'):]: value for name, value in halving.best_params_.items()}
+    return params, halving
 
 def evaluate_trained_model(model):
     """Evaluate a trained model using PyCaret's evaluate_model."""
@@ -65,9 +447,11 @@ def plot_feature_importance(model):
     importance_df = pull()
     return importance_df
 
-def save_trained_model(model, path):
-    """Save a trained model to disk."""
+def save_trained_model(model, path, profiler=None):
+    """Save a trained model to disk, with the training profile as <path>_profile.json if a profiler is given."""
     save_model(model, path)
+    if profiler is not None:
+        profiler.save(model_artifact_file(path, PROFILE_SUFFIX))
 
 def load_trained_model(path):
     """Load a trained model from disk."""
@@ -75,4 +459,263 @@ def load_trained_model(path):
 
 def predict_with_model(model, input_data):
     """Make predictions with a trained model."""
-    return predict_model(model, data=input_data)
\ No newline at end of file
+    return predict_model(model, data=input_data)
+
+def check_scoring_parity(engine, pipeline, data, atol=5e-4):
+    """
+    Compare a compiled scoring engine against PyCaret predict_model.
+    Args:
+        engine (ScoringEngine): Compiled engine
+        pipeline: Saved PyCaret pipeline the engine was compiled from
+        data (pd.DataFrame): Engineered features (no Attrition or EmployeeId)
+        atol (float): Allowed absolute difference in prediction_score
+    Returns:
+        dict: Label mismatches and the largest score difference
+    """
+    expected = predict_model(pipeline, data=data, verbose=False)
+    actual = engine.predict(data)
+    return {
+        'rows': len(data),
+        'non_finite_scores': int((~np.isfinite(actual['prediction_score'].to_numpy(dtype='float64'))).sum()),
+        'label_mismatches': int((expected['prediction_label'].to_numpy()
+                                 != actual['prediction_label'].to_numpy()).sum()),
+        'max_score_diff': float(np.max(np.abs(expected['prediction_score'].to_numpy(dtype='float64')
+                                              - actual['prediction_score'].to_numpy(dtype='float64')))),
+        'atol': atol,
+    }
+
+def parity_probe_records(X, levels=ORDINAL_FEATURES):
+    """
+    Return synthetic records that exercise every lookup of a compiled engine.
+    Starting from the first row of X, one record per declared level of each ordinal
+    column (including levels absent from X) and one record per categorical column
+    with a level the model has never seen.
+    Args:
+        X (pd.DataFrame): Engineered features (no Attrition or EmployeeId)
+        levels (dict): Declared levels of the ordinal columns
+    Returns:
+        pd.DataFrame: Records with the columns and dtypes of X
+    """
+    base = X.iloc[[0]]
+    records = []
+    for col, col_levels in levels.items():
+        if col in X.columns:
+            records.extend(base.assign(**{col: level}) for level in col_levels)
+    for col in X.columns:
+        if not pd.api.types.is_numeric_dtype(X[col]):
+            records.append(base.astype({col: 'object'}).assign(**{col: '__unseen__'}))
+    return pd.concat(records, ignore_index=True).astype(
+        {col: X[col].dtype for col in X.columns if pd.api.types.is_numeric_dtype(X[col])})
+
+def check_float32_parity(engine, data, atol=FLOAT32_ATOL):
+    """
+    Compare float32 scoring against float64 scoring with the same compiled engine.
+    The float32 run uses data with its float64 columns cast to float32, which is what
+    engineer_features(..., float32=True) produces. Probabilities must agree within
+    atol; labels may only differ for rows whose float64 probability is within atol
+    of the 0.5 threshold.
+    Args:
+        engine (ScoringEngine): Compiled engine
+        data (pd.DataFrame): Engineered features (no Attrition or EmployeeId)
+        atol (float): Allowed absolute difference in the positive-class probability
+    Returns:
+        dict: Largest probability difference and label mismatches outside the tolerance band
+    """
+    data32 = data.astype({col: 'float32' for col in data.columns if data[col].dtype == 'float64'})
+    proba64 = engine.astype('float64').predict_proba(data)
+    proba32 = engine.astype('float32').predict_proba(data32).astype('float64')
+    flipped = (proba64 > 0.5) != (proba32 > 0.5)
+    return {
+        'rows': len(data),
+        'max_proba_diff': float(np.max(np.abs(proba64 - proba32))) if len(data) else 0.0,
+        'label_mismatches': int((flipped & (np.abs(proba64 - 0.5) > atol)).sum()),
+        'atol': atol,
+    }
+
+def export_scoring_engine(data, model_path, target='Attrition', check_float32=False):
+    """
+    Compile a saved model into a PyCaret-free scoring engine saved next to it.
+    The engine is checked against predict_model on data and on parity_probe_records
+    before it is written, and records the digest of the model file so serving ignores
+    it once the model is saved again.
+    Args:
+        data (pd.DataFrame): Engineered training features, used to find levels and check parity
+        model_path (str): Path the model was saved to with save_trained_model (linear estimator, e.g. LDA)
+        target (str): Target column to drop from data
+        check_float32 (bool): Also require float32 scoring to match float64 within FLOAT32_ATOL
+    Returns:
+        ScoringEngine: The compiled engine
+    """
+    X = data.drop(columns=[c for c in [target, 'EmployeeId'] if c in data.columns])
+    pipeline = load_model(model_path, verbose=False)
+    engine = compile_scoring_engine(pipeline, X, lookup_features=ORDINAL_FEATURES,
+                                    model_digest=get_model_digest(model_path))
+    parity = check_scoring_parity(engine, pipeline, pd.concat([X, parity_probe_records(X)], ignore_index=True))
+    if parity['label_mismatches'] or parity['non_finite_scores'] or not parity['max_score_diff'] <= parity['atol']:
+        raise ValueError(f"Compiled scoring engine does not match predict_model: {parity}")
+    if check_float32:
+        parity32 = check_float32_parity(engine, X)
+        if parity32['label_mismatches'] or parity32['max_proba_diff'] > parity32['atol']:
+            raise ValueError(f"float32 scoring does not match float64 within tolerance: {parity32}")
+    engine.save(model_artifact_file(model_path, ENGINE_SUFFIX))
+    return engine
+
+# Population stability index above which a feature counts as drifted
+DRIFT_THRESHOLD = 0.25
+# Fewest new/changed rows for which PSI is computed; on smaller deltas empty bins alone
+# push it over DRIFT_THRESHOLD (about 1.1 at 50 drift-free rows, 0.13 at 160)
+MIN_DRIFT_ROWS = 200
+
+def _training_matrix(pipeline, data, target):
+    """Run the fitted preprocessing of pipeline on data, keeping EmployeeId and the target."""
+    X = data.drop(columns=[c for c in [target, 'EmployeeId'] if c in data.columns])
+    matrix = pipeline[:-1].transform(X).reset_index(drop=True)
+    matrix.insert(0, 'EmployeeId', data['EmployeeId'].to_numpy())
+    matrix[target] = data[target].to_numpy(dtype='int64')
+    return matrix
+
+def save_training_matrix(model_path, data, target='Attrition'):
+    """
+    Store the preprocessed training rows of a saved model next to it, for incremental_retrain.
+    Args:
+        model_path (str): Path the model was saved to with save_trained_model
+        data (pd.DataFrame): Engineered features (with EmployeeId and the target) the model was trained on
+        target (str): Target column
+    """
+    matrix = _training_matrix(load_model(model_path, verbose=False), data, target)
+    matrix.to_parquet(model_artifact_file(model_path, TRAINING_SUFFIX), index=False)
+
+def population_stability_index(expected, actual, bins=10):
+    """
+    Return the population stability index of actual against expected for one feature.
+    Bins are the deciles of expected, or its distinct values when it has few of them
+    (one-hot and ordinal columns).
+    """
+    values = np.unique(expected)
+    if len(values) <= bins:
+        edges = (values[:-1] + values[1:]) / 2
+    else:
+        edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)[1:-1]))
+    def shares(x):
+        counts = np.bincount(np.searchsorted(edges, x, side='right'), minlength=len(edges) + 1)
+        return np.clip(counts / max(len(x), 1), 1e-4, None)
+    e, a = shares(expected), shares(actual)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def _refit_estimator(pipeline, X, y):
+    """
+    Refit the final estimator of a fitted pipeline on preprocessed rows.
+    The pipeline's oversampler is applied to the rows first. Estimators with
+    warm_start (other than ensembles, which would only add trees) continue from
+    their current coefficients; the others, like LDA, recompute their fit from scratch.
+    """
+    from sklearn.base import clone
+    balance = dict(pipeline.steps).get('balance')
+    if balance is not None:
+        X, y = clone(balance.transformer.estimator).fit_resample(X, y)
+    estimator = pipeline.steps[-1][1]
+    params = estimator.get_params()
+    if 'warm_start' in params and not hasattr(estimator, 'estimators_'):
+        estimator = copy.deepcopy(estimator).set_params(warm_start=True)
+        estimator.fit(X, y)
+        return estimator.set_params(warm_start=params['warm_start'])
+    return clone(estimator).fit(X, y)
+
+def _holdout_score(model, holdout, target, optimize):
+    from sklearn.metrics import get_scorer
+    X = holdout.drop(columns=[c for c in [target, 'EmployeeId'] if c in holdout.columns])
+    return float(get_scorer(SEARCH_SCORERS[optimize])(model, X, holdout[target].astype('int64')))
+
+def _save_pipeline(model, model_path):
+    """Write a fitted pipeline where load_model and get_model expect it, replacing the file atomically."""
+    import joblib
+    path = model_artifact_file(model_path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump(model, f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
+
+def incremental_retrain(model_path, new_data, holdout, output_path=None, full_data=None, target='Attrition',
+                        model_name='lda', optimize='Recall', drift_threshold=DRIFT_THRESHOLD,
+                        min_drift_rows=MIN_DRIFT_ROWS, max_metric_drop=0.05):
+    """
+    Update a saved model with new and changed employee rows instead of retraining from the full history.
+    The fitted preprocessing (imputers, encoders, scaler, selected features) is kept;
+    only new_data is run through it. Its rows replace the stored training rows of the
+    same EmployeeId or are appended, and the final estimator is refitted on the result
+    (LDA recomputes its class means and covariance; warm_start estimators continue from
+    their coefficients). Oversampling is redone on the preprocessed rows. The updated
+    model is then scored on holdout against the previous one.
+    A full retrain (setup_modeling, train_and_tune_model, save_trained_model) on
+    full_data (with normalize_categoricals applied) runs instead when any feature's
+    population stability index of the new/changed rows against the previous training
+    rows exceeds drift_threshold, or when the updated
+    model loses more than max_metric_drop of the optimize metric on the holdout.
+    Drift is only checked when at least min_drift_rows rows come in; smaller updates
+    rely on the holdout check alone.
+    A compiled scoring engine next to output_path is removed, since it would still
+    serve the previous model; run export_scoring_engine again to rebuild it.
+    Args:
+        model_path (str): Previous model, saved with save_trained_model and save_training_matrix
+        new_data (pd.DataFrame): Engineered features of new/changed employees (with EmployeeId and the target)
+        holdout (pd.DataFrame): Engineered features with the target, for re-validation
+        output_path (str): Where to save the updated model; defaults to model_path
+        full_data (pd.DataFrame): Full engineered history, used for a full retrain; defaults to the feature store
+        target (str): Target column
+        model_name (str): PyCaret model ID for a full retrain
+        optimize (str): Holdout metric, one of SEARCH_SCORERS
+        drift_threshold (float): PSI above which a feature counts as drifted
+        min_drift_rows (int): Fewest new/changed rows for the drift check
+        max_metric_drop (float): Largest allowed loss of the holdout metric
+    Returns:
+        tuple: (updated model, report dict)
+    """
+    start = time.perf_counter()
+    output_path = output_path or model_path
+    pipeline = load_model(model_path, verbose=False)
+    previous = pd.read_parquet(model_artifact_file(model_path, TRAINING_SUFFIX))
+    update = _training_matrix(pipeline, new_data, target)
+    replaced = previous['EmployeeId'].isin(update['EmployeeId'])
+    updated = pd.concat([previous[~replaced], update], ignore_index=True)
+    features = [c for c in previous.columns if c not in ('EmployeeId', target)]
+    # Drift of the incoming rows themselves; against the merged history a small delta would be diluted
+    drift_checked = len(update) >= max(min_drift_rows, 1)
+    drift = {col: population_stability_index(previous[col].to_numpy(), update[col].to_numpy())
+             for col in features} if drift_checked else {}
+    report = {
+        'rows_added': int(len(update) - replaced.sum()),
+        'rows_updated': int(replaced.sum()),
+        'rows_total': len(updated),
+        'drift_checked': drift_checked,
+        'max_drift': round(max(drift.values(), default=0.0), 4),
+        'drifted_features': [col for col, value in drift.items() if value > drift_threshold],
+        f'previous_{optimize}': _holdout_score(pipeline, holdout, target, optimize),
+    }
+    if report['drifted_features']:
+        report['mode'], report['reason'] = 'full', 'drift'
+    else:
+        model = copy.deepcopy(pipeline)
+        model.steps[-1] = (model.steps[-1][0], _refit_estimator(pipeline, updated[features], updated[target]))
+        report[f'incremental_{optimize}'] = _holdout_score(model, holdout, target, optimize)
+        if report[f'incremental_{optimize}'] < report[f'previous_{optimize}'] - max_metric_drop:
+            report['mode'], report['reason'] = 'full', 'holdout'
+        else:
+            report['mode'], report['reason'] = 'incremental', None
+    if report['mode'] == 'incremental':
+        _save_pipeline(model, output_path)
+        updated.to_parquet(model_artifact_file(output_path, TRAINING_SUFFIX), index=False)
+    else:
+        if full_data is None:
+            from src.feature_store import load_features
+            full_data = load_features()
+        # Serving sends normalized labels, so train on them (a no-op for already normalized data)
+        full_data = normalize_categoricals(full_data)
+        setup_modeling(full_data, target=target, cache_dir=SETUP_CACHE_DIR)
+        save_trained_model(train_and_tune_model(model_name, optimize=optimize), output_path)
+        model = load_model(output_path, verbose=False)
+        save_training_matrix(output_path, full_data.loc[get_config('X_train').index], target)
+        report[f'full_{optimize}'] = _holdout_score(model, holdout, target, optimize)
+    engine_path = model_artifact_file(output_path, ENGINE_SUFFIX)
+    if os.path.exists(engine_path):
+        os.remove(engine_path)
+    report['seconds'] = round(time.perf_counter() - start, 2)
+    return model, report
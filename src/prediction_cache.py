@@ -0,0 +1,78 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+def record_key(record):
+    """
+    Return a stable hash of an employee record.
+    Keys are sorted and EmployeeId is left out, since it does not affect the prediction.
+    """
+    fields = {k: v for k, v in record.items() if k != 'EmployeeId'}
+    canonical = json.dumps(fields, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction rows with an optional time-to-live.
+    Entries belong to one model version; passing a different version to get/put
+    drops everything cached for the previous one.
+    """
+
+    def __init__(self, max_size=10000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached prediction for key under version, or None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        """Cache value for key under version, evicting the least recently used entries."""
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
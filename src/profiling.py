@@ -0,0 +1,125 @@
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib import metadata
+
+# Packages whose versions are recorded, so regressions can be traced to upgrades
+PROFILED_PACKAGES = ['pycaret', 'scikit-learn', 'imbalanced-learn', 'lightgbm', 'numpy', 'pandas']
+
+def package_versions(packages=PROFILED_PACKAGES):
+    """Return {package: installed version or None} for the given distribution names."""
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+def _rss_reader():
+    """
+    Return a function rss(children) giving the current RSS in bytes of this process,
+    plus that of its child processes if children is set. Uses psutil when installed;
+    otherwise falls back to the peak RSS reported by getrusage, which never decreases,
+    so per-phase peaks become peaks so far.
+    """
+    try:
+        import psutil
+    except ImportError:
+        import resource
+        # ru_maxrss is in kilobytes on Linux; for children it is the largest child's peak
+        def peak_rss(children):
+            total = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if children:
+                total += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            return total * 1024
+        return peak_rss
+    process = psutil.Process()
+    def rss(children):
+        total = process.memory_info().rss
+        # Listing the process tree is much slower than reading our own RSS, so it is opt-in
+        for child in process.children(recursive=True) if children else ():
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    return rss
+
+def _cpu_seconds():
+    """Return the user+system CPU time of this process and its finished children."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class PhaseProfiler:
+    """
+    Record wall time, CPU time and peak RSS of named training phases.
+    Use profiler.phase(name, **labels) as a context manager around each phase; the
+    labels (e.g. fold=2) are stored with the record. RSS is sampled by a background
+    thread every interval seconds while a phase is open, so phases shorter than the
+    interval report the RSS at their start and end. Worker processes are only included
+    in the RSS of phases opened with children=True (for phases run with n_jobs != 1).
+    CPU time covers this process and worker processes that have exited (live joblib
+    workers are not counted).
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.records = []
+        self._rss = _rss_reader()
+
+    @contextmanager
+    def phase(self, name, children=False, **labels):
+        record = {'phase': name, **labels}
+        peak = [self._rss(children)]
+        done = threading.Event()
+        def sample():
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], self._rss(children))
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall, 4)
+            record['cpu_seconds'] = round(_cpu_seconds() - cpu, 4)
+            done.set()
+            sampler.join()
+            record['peak_rss_mb'] = round(max(peak[0], self._rss(children)) / 2**20, 1)
+            self.records.append(record)
+
+    def summary(self):
+        """Return {phase: {calls, wall_seconds, cpu_seconds, peak_rss_mb}} over all records of each phase."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['phase'], {'calls': 0, 'wall_seconds': 0.0,
+                                                         'cpu_seconds': 0.0, 'peak_rss_mb': 0.0})
+            total['calls'] += 1
+            total['wall_seconds'] = round(total['wall_seconds'] + record['wall_seconds'], 4)
+            total['cpu_seconds'] = round(total['cpu_seconds'] + record['cpu_seconds'], 4)
+            total['peak_rss_mb'] = max(total['peak_rss_mb'], record['peak_rss_mb'])
+        return dict(sorted(totals.items(), key=lambda item: -item[1]['wall_seconds']))
+
+    def report(self):
+        """Return the profile as a JSON-serializable dict (environment, per-phase totals and all records)."""
+        return {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'packages': package_versions(),
+            'summary': self.summary(),
+            'phases': self.records,
+        }
+
+    def save(self, path):
+        """Write the report to path as JSON and return the report."""
+        report = self.report()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        return report
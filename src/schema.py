@@ -0,0 +1,116 @@
+# Single definition of the employee data schema. The read_csv dtypes, the casts in
+# clean_data, the PyCaret feature spec and the API's EmployeeRecord model are all
+# derived from the constants below.
+from typing import Optional
+
+TARGET = 'Attrition'
+ID_COLUMN = 'EmployeeId'
+
+# Columns of data/employee_data.csv in file order, with their dtype after cleaning
+RAW_COLUMNS = {
+    'EmployeeId': 'int64',
+    'Age': 'int8',
+    'Attrition': 'float64',
+    'BusinessTravel': 'category',
+    'DailyRate': 'int16',
+    'Department': 'category',
+    'DistanceFromHome': 'int64',
+    'Education': 'int8',
+    'EducationField': 'category',
+    'EmployeeCount': 'int64',
+    'EnvironmentSatisfaction': 'int8',
+    'Gender': 'category',
+    'HourlyRate': 'int16',
+    'JobInvolvement': 'int8',
+    'JobLevel': 'int8',
+    'JobRole': 'category',
+    'JobSatisfaction': 'int8',
+    'MaritalStatus': 'category',
+    'MonthlyIncome': 'int32',
+    'MonthlyRate': 'int32',
+    'NumCompaniesWorked': 'int8',
+    'Over18': 'category',
+    'OverTime': 'category',
+    'PercentSalaryHike': 'int8',
+    'PerformanceRating': 'int8',
+    'RelationshipSatisfaction': 'int8',
+    'StandardHours': 'int8',
+    'StockOptionLevel': 'int8',
+    'TotalWorkingYears': 'int8',
+    'TrainingTimesLastYear': 'int8',
+    'WorkLifeBalance': 'int8',
+    'YearsAtCompany': 'int8',
+    'YearsInCurrentRole': 'int8',
+    'YearsSinceLastPromotion': 'int8',
+    'YearsWithCurrManager': 'int8',
+}
+
+# Ordinal features and their levels in order
+ORDINAL_FEATURES = {
+    'Education': [1, 2, 3, 4, 5],
+    'EnvironmentSatisfaction': [1, 2, 3, 4],
+    'JobInvolvement': [1, 2, 3, 4],
+    'JobLevel': [1, 2, 3, 4, 5],
+    'JobSatisfaction': [1, 2, 3, 4],
+    'PerformanceRating': [1, 2, 3, 4],
+    'RelationshipSatisfaction': [1, 2, 3, 4],
+    'StockOptionLevel': [0, 1, 2, 3],
+    'WorkLifeBalance': [1, 2, 3, 4]
+}
+
+# Features added by engineer_features
+ENGINEERED_CATEGORICAL = ['AgeGroup']
+ENGINEERED_NUMERIC = ['TenureRatio', 'OverallSatisfaction', 'SalaryToAgeRatio',
+                      'SalaryToTenureRatio', 'PromotionRate', 'RoleStability',
+                      'TravelImpact']
+
+# Raw categorical columns, and the categoricals used for modeling
+RAW_CATEGORICAL = [col for col, dtype in RAW_COLUMNS.items() if dtype == 'category']
+CATEGORICAL_FEATURES = RAW_CATEGORICAL + ENGINEERED_CATEGORICAL
+
+# Columns that are present in the raw data but not used as model inputs
+NON_FEATURES = [ID_COLUMN, TARGET, 'EmployeeCount']
+
+NUMERIC_FEATURES = [col for col, dtype in RAW_COLUMNS.items()
+                    if dtype != 'category' and col not in NON_FEATURES
+                    and col not in ORDINAL_FEATURES] + ENGINEERED_NUMERIC
+
+def csv_dtypes(columns=None):
+    """
+    Return the dtype= mapping for pd.read_csv so files parse straight into compact dtypes.
+    The target is left out because raw extracts may hold missing or Yes/No values.
+    Args:
+        columns (list): Restrict the mapping to these columns
+    """
+    dtypes = {col: dtype for col, dtype in RAW_COLUMNS.items() if col != TARGET}
+    if columns is not None:
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in columns}
+    return dtypes
+
+def clean_dtypes(columns):
+    """Return the casts clean_data applies, restricted to the given columns (target and ID excluded)."""
+    return {col: RAW_COLUMNS[col] for col in columns
+            if col in RAW_COLUMNS and col not in (TARGET, ID_COLUMN)}
+
+def pycaret_feature_spec():
+    """Return the numeric/categorical/ordinal feature arguments for PyCaret setup."""
+    return {
+        'numeric_features': list(NUMERIC_FEATURES),
+        'categorical_features': list(CATEGORICAL_FEATURES),
+        'ordinal_features': {col: list(levels) for col, levels in ORDINAL_FEATURES.items()},
+    }
+
+def api_fields():
+    """
+    Return the field definitions of the API's EmployeeRecord model, in file order.
+    Every raw column except the target is required; EmployeeId may be null.
+    Returns:
+        dict: {field name: (type, default)} as accepted by pydantic.create_model
+    """
+    fields = {}
+    for col, dtype in RAW_COLUMNS.items():
+        if col == TARGET:
+            continue
+        field_type = str if dtype == 'category' else int
+        fields[col] = (Optional[field_type] if col == ID_COLUMN else field_type, ...)
+    return fields
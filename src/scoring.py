@@ -0,0 +1,227 @@
+import hashlib
+import numpy as np
+import pandas as pd
+
+# A compiled engine is stored next to the PyCaret model as <model_path>_engine.npz
+# Below this many rows the per-value dict lookup beats building pd.Categorical codes
+_SMALL_BATCH = 64
+# Largest allowed difference between float32 and float64 probabilities (see check_float32_parity)
+FLOAT32_ATOL = 1e-4
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _decision_function(pipeline, X):
+    """Return the raw decision score of a fitted pipeline as a 1-D float array."""
+    estimator = pipeline.steps[-1][1]
+    if not hasattr(estimator, 'decision_function'):
+        raise ValueError('Only models with a linear decision_function (e.g. LDA) can be compiled')
+    # The PyCaret pipeline does not route decision_function through its transformers
+    X_transformed = pipeline[:-1].transform(X)
+    return np.asarray(estimator.decision_function(X_transformed), dtype='float64').ravel()
+
+def compile_scoring_engine(pipeline, X_sample, lookup_features=(), model_digest=None):
+    """
+    Compile a fitted PyCaret pipeline with a linear final estimator into a ScoringEngine.
+    Imputation, rare-category grouping, ordinal/one-hot encoding, normalization and
+    feature selection all act on one input column at a time and the estimator is
+    linear, so the decision score is a sum of per-column contributions. Those are
+    recovered by probing the pipeline around a baseline row: numeric columns get a
+    slope, categorical and ordinal columns get a lookup table over their levels.
+    Every lookup column also gets a contribution for values outside its table,
+    probed with an unseen label or an out-of-range number.
+    Args:
+        pipeline: Fitted PyCaret pipeline as returned by load_model
+        X_sample (pd.DataFrame): Training features (no target) providing the input columns and levels
+        lookup_features (iterable): Numeric columns to treat as lookups (e.g. ordinal features);
+            a {column: levels} dict also adds every declared level, seen in X_sample or not
+        model_digest (str): file_digest of the model artifact, stored to detect a stale engine
+    Returns:
+        ScoringEngine: The compiled scoring kernel
+    """
+    # feature_names_in_ also lists the target, which is not an input at predict time
+    columns = [c for c in getattr(pipeline, 'feature_names_in_', X_sample.columns)
+               if c in X_sample.columns]
+    X_sample = X_sample[columns]
+    declared_levels = lookup_features if isinstance(lookup_features, dict) else {}
+    lookup_features = set(lookup_features)
+    lookup_cols = [c for c in columns
+                   if c in lookup_features or not pd.api.types.is_numeric_dtype(X_sample[c])]
+    numeric_cols = [c for c in columns if c not in lookup_cols]
+    # Baseline row: median of numeric columns, most frequent level of the others
+    baseline = {c: X_sample[c].median() for c in numeric_cols}
+    baseline.update({c: round(baseline[c]) for c in numeric_cols
+                     if pd.api.types.is_integer_dtype(X_sample[c])})
+    baseline.update({c: X_sample[c].mode().iloc[0] for c in lookup_cols})
+    # One probe frame so the pipeline is only run once
+    probes = [dict(baseline)]
+    for col in numeric_cols:
+        probes.append({**baseline, col: baseline[col] + 1})
+    levels = {}
+    for col in lookup_cols:
+        col_levels = pd.unique(X_sample[col].dropna())
+        if not pd.api.types.is_numeric_dtype(X_sample[col]):
+            col_levels = col_levels.astype(str)
+        else:
+            col_levels = np.union1d(col_levels, declared_levels.get(col, []))
+        levels[col] = np.sort(col_levels)
+        probes.extend({**baseline, col: level} for level in levels[col])
+        # An unseen value shows how the pipeline treats levels it was not fitted on
+        if pd.api.types.is_numeric_dtype(X_sample[col]):
+            probes.append({**baseline, col: levels[col].max() + 1})
+        else:
+            probes.append({**baseline, col: '__unseen__'})
+    probe_df = pd.DataFrame(probes, columns=columns).astype(
+        {c: X_sample[c].dtype for c in columns if pd.api.types.is_numeric_dtype(X_sample[c])})
+    raw = _decision_function(pipeline, probe_df)
+    base_score = raw[0]
+    scores = raw - base_score
+    pos = 1
+    numeric_coef = scores[pos:pos + len(numeric_cols)].copy()
+    pos += len(numeric_cols)
+    intercept = base_score - float(np.dot(numeric_coef, [baseline[c] for c in numeric_cols]))
+    tables = {}
+    for col in lookup_cols:
+        n = len(levels[col])
+        values = scores[pos:pos + n].copy()
+        unseen = scores[pos + n]
+        pos += n + 1
+        if not np.all(np.isfinite(values)) or not np.isfinite(unseen):
+            raise ValueError(f"Pipeline returned a non-finite decision while probing '{col}'")
+        tables[col] = (levels[col], values, unseen)
+    classes = np.asarray(pipeline.steps[-1][1].classes_)
+    return ScoringEngine(intercept, numeric_cols, numeric_coef, tables, classes, model_digest=model_digest)
+
+class ScoringEngine:
+    """
+    Additive linear scoring kernel compiled from a PyCaret pipeline.
+    decision = intercept + sum(numeric_coef * x) + sum(lookup[col][value]),
+    with the positive-class probability given by the logistic function, which is
+    how LDA and logistic regression compute predict_proba for two classes.
+    With dtype='float32' inputs, coefficients and the decision are kept in float32;
+    prediction_score is still reported as a float64 rounded to 4 decimals.
+    model_digest identifies the model artifact the engine was compiled from.
+    """
+
+    def __init__(self, intercept, numeric_features, numeric_coef, tables, classes, dtype='float64',
+                 model_digest=None):
+        self.intercept = float(intercept)
+        self.model_digest = model_digest
+        self.numeric_features = list(numeric_features)
+        self.numeric_coef = np.asarray(numeric_coef, dtype='float64')
+        self.tables = tables
+        self.dtype = np.dtype(dtype)
+        # Coefficients and lookup tables (with the unseen contribution appended) in the compute dtype
+        self._coef = self.numeric_coef.astype(self.dtype)
+        self._tables = {col: np.append(values, unseen).astype(self.dtype)
+                        for col, (_, values, unseen) in tables.items()}
+        self.classes = np.asarray(classes)
+        # A target read from CSV as 0.0/1.0 is reported as integer labels, like predict_model
+        if self.classes.dtype.kind == 'f' and np.all(self.classes == np.round(self.classes)):
+            self.classes = self.classes.astype('int64')
+        # Plain dicts for the single-record and small-batch paths
+        self._dicts = {col: dict(zip(levels.tolist(), values.tolist()))
+                       for col, (levels, values, _) in tables.items()}
+        self._coef_items = list(zip(self.numeric_features, self.numeric_coef.tolist()))
+
+    @property
+    def feature_names(self):
+        """Input columns the engine reads."""
+        return self.numeric_features + list(self.tables)
+
+    def astype(self, dtype):
+        """Return a copy of the engine that computes in dtype ('float32' or 'float64')."""
+        return ScoringEngine(self.intercept, self.numeric_features, self.numeric_coef,
+                             self.tables, self.classes, dtype=dtype, model_digest=self.model_digest)
+
+    def _lookup(self, col, values):
+        levels, _, unseen = self.tables[col]
+        if levels.dtype.kind not in 'fiu':
+            values = values.astype(str)
+        if len(values) < _SMALL_BATCH:
+            mapping = self._dicts[col]
+            return np.array([mapping.get(v, unseen) for v in values.tolist()], dtype=self.dtype)
+        codes = pd.Categorical(values, categories=levels).codes
+        # Code -1 (unknown level) picks the trailing unseen contribution
+        return self._tables[col][codes]
+
+    def decision_function(self, X):
+        """Return the raw decision score for every row of X."""
+        decision = X[self.numeric_features].to_numpy(dtype=self.dtype) @ self._coef
+        decision += self.dtype.type(self.intercept)
+        for col in self.tables:
+            values = X[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Look up each level once and index by the category codes (-1 is missing)
+                per_level = self._lookup(col, values.cat.categories.to_numpy())
+                per_level = np.append(per_level, self.tables[col][2]).astype(self.dtype, copy=False)
+                decision += per_level[values.cat.codes.to_numpy()]
+            else:
+                decision += self._lookup(col, values.to_numpy())
+        return decision
+
+    def predict_proba(self, X):
+        """Return the positive-class probability for every row of X."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X):
+        """
+        Score X the way PyCaret predict_model does.
+        Args:
+            X (pd.DataFrame): Engineered features (no Attrition or EmployeeId)
+        Returns:
+            pd.DataFrame: X with prediction_label and prediction_score columns added
+        """
+        proba = self.predict_proba(X)
+        positive = proba > 0.5
+        result = X.copy()
+        result['prediction_label'] = np.where(positive, self.classes[-1], self.classes[0])
+        # Like predict_model, the score is the probability of the predicted label
+        result['prediction_score'] = np.round(np.where(positive, proba, 1.0 - proba).astype('float64'), 4)
+        return result
+
+    def score_record(self, record):
+        """Return the positive-class probability for a single record given as a dict."""
+        decision = self.intercept
+        for col, coef in self._coef_items:
+            decision += coef * record[col]
+        for col, mapping in self._dicts.items():
+            value = record[col]
+            if self.tables[col][0].dtype.kind not in 'fiu':
+                value = str(value)
+            decision += mapping.get(value, self.tables[col][2])
+        return 1.0 / (1.0 + np.exp(-decision))
+
+    def save(self, path):
+        """Save the engine as a NumPy .npz archive (no pickle)."""
+        arrays = {
+            'intercept': np.array(self.intercept),
+            'classes': self.classes,
+            'numeric_features': np.array(self.numeric_features, dtype=str),
+            'numeric_coef': self.numeric_coef,
+            'lookup_features': np.array(list(self.tables), dtype=str),
+        }
+        if self.model_digest is not None:
+            arrays['model_digest'] = np.array(self.model_digest)
+        for i, (levels, values, unseen) in enumerate(self.tables.values()):
+            arrays[f'levels_{i}'] = levels
+            arrays[f'values_{i}'] = values
+            arrays[f'unseen_{i}'] = np.array(unseen)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path, dtype='float64'):
+        """Load an engine saved with ScoringEngine.save, computing in dtype."""
+        with np.load(path, allow_pickle=False) as data:
+            tables = {}
+            for i, col in enumerate(data['lookup_features'].tolist()):
+                tables[col] = (data[f'levels_{i}'], data[f'values_{i}'], float(data[f'unseen_{i}']))
+            model_digest = str(data['model_digest']) if 'model_digest' in data.files else None
+            return cls(float(data['intercept']), data['numeric_features'].tolist(),
+                       data['numeric_coef'], tables, data['classes'], dtype=dtype,
+                       model_digest=model_digest)
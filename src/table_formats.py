@@ -0,0 +1,70 @@
+import io
+import pandas as pd
+
+# Media types accepted for columnar uploads, mapped to a format name
+MEDIA_TYPES = {
+    'text/csv': 'csv',
+    'application/vnd.apache.parquet': 'parquet',
+    'application/x-parquet': 'parquet',
+    'application/vnd.apache.arrow.stream': 'arrow',
+    'application/vnd.apache.arrow.file': 'arrow',
+}
+# Media type used when responding in each format
+RESPONSE_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+def format_from_media_type(content_type):
+    """
+    Return the table format for a Content-Type header value.
+    Raises:
+        ValueError: If the media type is not a supported columnar format
+    """
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported media type '{media_type}', expected one of {sorted(MEDIA_TYPES)}")
+    return MEDIA_TYPES[media_type]
+
+def read_table(data, fmt):
+    """
+    Parse a CSV, Parquet or Arrow IPC payload into a DataFrame.
+    Args:
+        data (bytes): Raw payload
+        fmt (str): 'csv', 'parquet' or 'arrow'
+    Returns:
+        pd.DataFrame: Parsed table
+    """
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data))
+    if fmt == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    import pyarrow as pa
+    try:
+        reader = pa.ipc.open_stream(data)
+    except pa.ArrowInvalid:
+        reader = pa.ipc.open_file(data)
+    return reader.read_all().to_pandas()
+
+def write_table(df, fmt):
+    """
+    Serialize a DataFrame as CSV, Parquet or an Arrow IPC stream.
+    Args:
+        df (pd.DataFrame): Table to serialize
+        fmt (str): 'csv', 'parquet' or 'arrow'
+    Returns:
+        bytes: Serialized payload
+    """
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if fmt == 'parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
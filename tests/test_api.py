@@ -0,0 +1,17 @@
+import asyncio
+import httpx
+import pytest
+from api.main import app
+
+def post(url, **kwargs):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+            return await client.post(url, **kwargs)
+    return asyncio.run(send())
+
+@pytest.mark.parametrize('chunk_size', [0, -1, 10_000_000])
+def test_stream_chunk_size_is_validated(chunk_size):
+    assert post(f'/predict?stream=true&chunk_size={chunk_size}', json=[]).status_code == 422
+    response = post(f'/predict/bulk?stream=true&chunk_size={chunk_size}', content=b'EmployeeId\n1\n',
+                    headers={'content-type': 'text/csv'})
+    assert response.status_code == 422
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+from src.data_processing import DEDUP_MODES, clean_data, load_data
+
+@pytest.fixture(scope='module')
+def raw():
+    df = load_data('data/employee_data.csv')
+    # Exact duplicates and a missing target, so every mode removes rows
+    df = pd.concat([df, df.head(5)])
+    df.iloc[7, df.columns.get_loc('Attrition')] = None
+    return df
+
+@pytest.mark.parametrize('dedup', DEDUP_MODES)
+@pytest.mark.parametrize('unique_index', [True, False])
+def test_inplace_matches_copy(raw, dedup, unique_index):
+    df = raw.reset_index(drop=True) if unique_index else raw
+    assert df.index.is_unique == unique_index
+    expected = clean_data(df, dedup=dedup)
+    cleaned = df.copy()
+    assert clean_data(cleaned, inplace=True, dedup=dedup) is cleaned
+    assert_frame_equal(cleaned, expected)
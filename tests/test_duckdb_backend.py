@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+from src import eda_tools
+from src.data_processing import DEDUP_MODES, clean_data, load_data, save_data
+from src.feature_engineering import engineer_features
+
+pytest.importorskip('duckdb')
+from src import duckdb_backend as db  # noqa: E402
+
+RAW_PATH = 'data/employee_data.csv'
+
+def assert_same(expected, actual, **kwargs):
+    """DuckDB results come back with a fresh RangeIndex."""
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True), **kwargs)
+
+@pytest.fixture(scope='module')
+def raw():
+    return load_data(RAW_PATH)
+
+@pytest.fixture(scope='module')
+def raw_with_duplicates(raw, tmp_path_factory):
+    """Raw data with repeated rows, as a DataFrame and as CSV and Parquet files."""
+    df = pd.concat([raw, raw.iloc[:30]], ignore_index=True)
+    folder = tmp_path_factory.mktemp('raw')
+    save_data(df, str(folder / 'raw.csv'))
+    save_data(df, str(folder / 'raw.parquet'))
+    return df, [df, str(folder / 'raw.csv'), str(folder / 'raw.parquet')]
+
+@pytest.fixture(scope='module')
+def features_path(raw, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('features') / 'features.parquet')
+    save_data(engineer_features(clean_data(raw)), path)
+    return path
+
+def test_load_data(raw):
+    assert_same(raw, db.load_data(RAW_PATH))
+    assert_same(load_data(RAW_PATH, columns=['Age', 'Department']),
+                db.load_data(RAW_PATH, columns=['Age', 'Department']))
+
+@pytest.mark.parametrize('dedup', DEDUP_MODES)
+def test_clean_data(raw_with_duplicates, dedup):
+    df, sources = raw_with_duplicates
+    expected = clean_data(df, dedup=dedup)
+    for source in sources:
+        assert_same(expected, db.clean_data(source, dedup=dedup))
+
+@pytest.mark.parametrize('float32', [False, True])
+def test_engineer_features(raw, float32):
+    cleaned = clean_data(raw)
+    expected = engineer_features(cleaned, float32=float32)
+    assert_same(expected, db.engineer_features(cleaned, float32=float32))
+    assert_same(expected, db.clean_and_engineer(RAW_PATH, float32=float32))
+
+def test_summaries(raw, features_path):
+    features = load_data(features_path)
+    assert_same(eda_tools.get_numeric_summary(features), db.get_numeric_summary(features_path),
+                check_exact=False, rtol=1e-9)
+    expected = eda_tools.get_categorical_summary(features)
+    actual = db.get_categorical_summary(features_path)
+    assert list(actual.columns) == list(expected.columns)
+    for col in expected.columns:
+        assert [str(v) for v in actual[col]] == [str(v) for v in expected[col]], col
+    expected_counts = eda_tools.get_value_counts(features)
+    actual_counts = db.get_value_counts(features_path)
+    assert list(actual_counts) == list(expected_counts)
+    for col, counts in expected_counts.items():
+        counts = counts.astype('int64').set_axis(counts.index.astype(str))
+        pd.testing.assert_series_equal(counts.sort_index(), actual_counts[col].sort_index(),
+                                       check_names=False, check_index_type=False)
+    assert_same(eda_tools.get_missing_values(raw), db.get_missing_values(RAW_PATH))
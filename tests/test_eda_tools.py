@@ -0,0 +1,13 @@
+import pytest
+from src.data_processing import clean_data, load_data, save_data
+from src.eda_tools import get_categorical_summary, get_value_counts
+from src.schema import RAW_CATEGORICAL
+
+@pytest.mark.parametrize('suffix', ['csv', 'parquet', 'feather'])
+def test_categorical_summaries_after_round_trip(tmp_path, suffix):
+    path = str(tmp_path / f'employee_data_cleaned.{suffix}')
+    save_data(clean_data(load_data('data/employee_data.csv')), path)
+    df = load_data(path)
+    summary = get_categorical_summary(df)
+    assert set(RAW_CATEGORICAL) <= set(summary.columns)
+    assert set(get_value_counts(df)) == set(summary.columns)
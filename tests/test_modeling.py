@@ -0,0 +1,86 @@
+import os
+import time
+import pandas as pd
+import pytest
+from src import modeling
+from src.data_processing import clean_data, load_data
+from src.feature_engineering import engineer_features, normalize_categoricals
+
+@pytest.fixture(scope='module')
+def features():
+    return normalize_categoricals(engineer_features(clean_data(load_data('data/employee_data.csv'))))
+
+@pytest.fixture(scope='module')
+def experiment(features):
+    return modeling.setup_modeling(features)
+
+def _crashing_worker(name, folds, seed, results):
+    if name == 'lda':
+        os._exit(3)
+    results.put((name, 'failed', 'RuntimeError: boom'))
+
+def test_crashed_worker_is_reported_immediately(monkeypatch):
+    monkeypatch.setattr(modeling, '_candidate_worker', _crashing_worker)
+    monkeypatch.setattr(modeling, '_preprocess_folds', lambda fix_imbalance: [])
+    monkeypatch.setattr(modeling, 'get_config', lambda name: 0)
+    start = time.monotonic()
+    leaderboard = modeling.compare_candidates(['lda', 'lr'], budget=60, n_jobs=2)
+    assert time.monotonic() - start < 10
+    assert leaderboard.loc['lda', 'Status'] == 'crashed'
+    assert leaderboard.loc['lda', 'Error'] == 'exit code 3'
+    assert leaderboard.loc['lr', 'Status'] == 'failed'
+
+def test_prune_setup_cache_keeps_most_recent(tmp_path):
+    for i, key in enumerate(['a', 'b', 'c']):
+        for suffix in ('.pkl', '.data.pkl'):
+            path = tmp_path / f'{key}{suffix}'
+            path.write_bytes(b'')
+            os.utime(path, (i, i))
+    assert modeling.prune_setup_cache(str(tmp_path), max_entries=2) == ['a']
+    assert sorted(os.listdir(tmp_path)) == ['b.data.pkl', 'b.pkl', 'c.data.pkl', 'c.pkl']
+
+def test_setup_cache_key_tracks_package_versions(monkeypatch):
+    df = pd.DataFrame({'x': [1, 2]})
+    key = modeling.setup_cache_key(df, {})
+    monkeypatch.setattr(modeling, 'package_versions',
+                        lambda packages: {package: '0.0' for package in packages})
+    assert modeling.setup_cache_key(df, {}) != key
+
+@pytest.mark.parametrize('optimize', ['Precision', 'precision', 'Prec.'])
+def test_search_metric_accepts_any_pycaret_name(experiment, optimize):
+    metric = modeling._search_metric(optimize)
+    assert (metric.name, metric.display_name) == ('Precision', 'Prec.')
+
+def test_tune_reports_metric_by_display_column(experiment):
+    _, report = modeling.train_and_tune_model(optimize='precision', n_iter=2, report=True)
+    assert 0 <= report['flat_Precision'] <= 1
+
+def test_tune_rejects_unknown_metric_before_training(experiment, monkeypatch):
+    monkeypatch.setattr(modeling, 'create_model', None)
+    with pytest.raises(ValueError, match='optimize'):
+        modeling.train_and_tune_model(optimize='Kappa')
+
+def test_small_drift_free_delta_stays_incremental(experiment, features, tmp_path):
+    train = features.loc[modeling.get_config('X_train').index]
+    test = features.loc[modeling.get_config('X_test').index]
+    path = str(tmp_path / 'lda')
+    modeling.save_trained_model(modeling.create_model('lda', verbose=False), path)
+    modeling.save_training_matrix(path, train)
+    delta, holdout = test.iloc[:20], test.iloc[20:]
+    # The PSI of these rows alone is far above the threshold, from empty bins only
+    previous = pd.read_parquet(modeling.model_artifact_file(path, modeling.TRAINING_SUFFIX))
+    update = modeling._training_matrix(modeling.load_model(path, verbose=False), delta, 'Attrition')
+    assert max(modeling.population_stability_index(previous[col].to_numpy(), update[col].to_numpy())
+               for col in previous.columns[1:-1]) > modeling.DRIFT_THRESHOLD
+    _, report = modeling.incremental_retrain(path, delta, holdout)
+    assert not report['drift_checked']
+    assert report['mode'] == 'incremental'
+    assert report['rows_added'] == 20
+
+@pytest.mark.parametrize('cached, profile, expected', [(False, False, 0), (False, True, 1), (True, True, 0)])
+def test_setup_steps_profiled_only_on_request_and_cache_miss(monkeypatch, cached, profile, expected):
+    calls = []
+    monkeypatch.setattr(modeling, '_setup_or_load', lambda df, config, cache_dir, profiler: (None, cached))
+    monkeypatch.setattr(modeling, 'profile_setup_pipeline', calls.append)
+    modeling.setup_modeling(pd.DataFrame({'Attrition': [0, 1]}), profiler=object(), profile=profile)
+    assert len(calls) == expected
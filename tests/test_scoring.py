@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.data_processing import clean_data, load_data
+from src.feature_engineering import engineer_features, normalize_categoricals
+from src.inference import clear_model_cache, get_scoring_engine
+from src.modeling import (check_scoring_parity, export_scoring_engine, parity_probe_records,
+                          save_trained_model, setup_modeling)
+from src.schema import ORDINAL_FEATURES
+
+@pytest.fixture(scope='module')
+def features():
+    return normalize_categoricals(engineer_features(clean_data(load_data('data/employee_data.csv'))))
+
+@pytest.fixture(scope='module')
+def model_path(features, tmp_path_factory):
+    from pycaret.classification import create_model
+    setup_modeling(features)
+    path = str(tmp_path_factory.mktemp('models') / 'lda')
+    save_trained_model(create_model('lda', verbose=False), path)
+    return path
+
+def test_engine_matches_pycaret_on_probe_records(features, model_path):
+    from pycaret.classification import load_model
+    engine = export_scoring_engine(features, model_path)
+    X = features.drop(columns=['Attrition', 'EmployeeId'])
+    probes = parity_probe_records(X)
+    # Every declared ordinal level is probed, including ones missing from the data
+    assert set(probes['PerformanceRating']) >= set(ORDINAL_FEATURES['PerformanceRating'])
+    assert (probes == '__unseen__').any(axis=1).sum() > 0
+    parity = check_scoring_parity(engine, load_model(model_path, verbose=False), probes)
+    assert parity['label_mismatches'] == 0
+    assert parity['non_finite_scores'] == 0
+    assert parity['max_score_diff'] <= parity['atol']
+
+def test_engine_scores_unseen_numeric_levels(features, model_path):
+    engine = export_scoring_engine(features, model_path)
+    X = features.drop(columns=['Attrition', 'EmployeeId']).head(3).copy()
+    X['PerformanceRating'] = np.array([2, 9, 1], dtype=X['PerformanceRating'].dtype)
+    assert np.isfinite(engine.predict(X)['prediction_score']).all()
+
+def test_stale_engine_is_ignored(features, model_path):
+    from pycaret.classification import create_model
+    export_scoring_engine(features, model_path)
+    clear_model_cache()
+    assert get_scoring_engine(model_path) is not None
+    # Saving a different model leaves the engine compiled from the old one behind
+    save_trained_model(create_model('lda', solver='lsqr', shrinkage=0.5, verbose=False), model_path)
+    assert get_scoring_engine(model_path) is None